@@ -2,7 +2,7 @@
 # ---------------------------------------------------------------------------
 # Initialization for AKGeomorph Module
 # Author: Timm Nawrocki
-# Last Updated: 2024-05-04
+# Last Updated: 2026-10-14
 # Usage: Individual functions have varying requirements. All functions that use arcpy must be executed in an ArcGIS Pro Python 3.9+ distribution.
 # Description: This initialization file imports modules in the package so that the contents are accessible.
 # ---------------------------------------------------------------------------
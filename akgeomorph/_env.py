@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Raster environment
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-14
+# Usage: Execute in ArcGIS Pro Python 3.9+.
+# Description: "Raster environment" contains a context manager that sets the arcpy environment to the grid of a study area raster and restores the previous environment on exit, and a context manager that provides temporary paths for intermediate rasters.
+# ---------------------------------------------------------------------------
+
+# Import packages
+import contextlib
+import os
+import shutil
+import tempfile
+from akgeomorph._rast import describe_area
+
+# Import arcpy packages if available
+try:
+    import arcpy
+    from arcpy.sa import Raster
+except ImportError:
+    arcpy = None
+
+
+# Define context manager to set the arcpy raster environment
+@contextlib.contextmanager
+def raster_env(area_input, parallel='75%'):
+    """
+    Description: sets overwrite, core usage, snap raster, extent, cell size, and tiled output environments from a study area raster
+    Inputs: 'area_input' -- a raster of the study area to set snap raster and extent
+            'parallel' -- a string of the parallel processing factor
+    Returned Value: Yields the study area raster object and its cell size
+    Preconditions: requires an existing study area raster
+    """
+
+    # Store previous environment
+    settings = ['overwriteOutput', 'parallelProcessingFactor', 'snapRaster', 'extent', 'cellSize', 'compression',
+                'tileSize']
+    previous = {setting: getattr(arcpy.env, setting) for setting in settings}
+
+    # Read cached raster properties
+    area_raster = Raster(area_input)
+    cell_size, bounds = describe_area(area_input)
+
+    try:
+        # Set overwrite option
+        arcpy.env.overwriteOutput = True
+
+        # Specify core usage
+        arcpy.env.parallelProcessingFactor = parallel
+
+        # Set snap raster and extent
+        arcpy.env.snapRaster = area_raster
+        arcpy.env.extent = ' '.join(str(bound) for bound in bounds)
+
+        # Set cell size environment
+        arcpy.env.cellSize = cell_size
+
+        # Write tiled and compressed outputs
+        arcpy.env.compression = 'LZW'
+        arcpy.env.tileSize = '512 512'
+
+        yield area_raster, cell_size
+
+    finally:
+        # Restore previous environment
+        for setting, value in previous.items():
+            setattr(arcpy.env, setting, value)
+
+
+# Define context manager to provide a temporary raster path
+@contextlib.contextmanager
+def scratch_raster(name):
+    """
+    Description: provides a file path in a temporary folder for an uncompressed intermediate raster and deletes the folder on exit
+    Inputs: 'name' -- a string file name for the intermediate raster
+    Returned Value: Yields a file path for the intermediate raster
+    Preconditions: uses the arcpy scratch folder when it is set
+    """
+
+    # Create temporary folder
+    scratch_root = getattr(arcpy.env, 'scratchFolder', None) if arcpy is not None else None
+    scratch_folder = tempfile.mkdtemp(prefix='akgeomorph_', dir=scratch_root)
+
+    # Store previous compression environment
+    previous = arcpy.env.compression if arcpy is not None else None
+
+    try:
+        # Write intermediate rasters without compression
+        if arcpy is not None:
+            arcpy.env.compression = 'NONE'
+
+        yield os.path.join(scratch_folder, name)
+
+    finally:
+        # Restore previous compression environment
+        if arcpy is not None:
+            arcpy.env.compression = previous
+
+        # Delete temporary folder
+        shutil.rmtree(scratch_folder, ignore_errors=True)
@@ -0,0 +1,570 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Raster kernels
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-14
+# Usage: Requires numpy and numba.
+# Description: "Raster kernels" contains compiled per-cell kernels that fuse raster math, integer conversion, and area masking into a single pass over a raster block.
+# ---------------------------------------------------------------------------
+
+# Import packages
+import math
+import numpy as np
+from numba import njit
+from numba import prange
+
+# Define constants
+DEG2RAD = math.pi / 180
+INT16_NODATA = -32768
+INT16_MAXIMUM = 32767
+FLOAT_NODATA = -2147483648.0
+
+# Define lookup table of -cos(aspect) at 0.1 degree steps from 0 to 360.1 degrees
+NEGATIVE_COS_TABLE = -np.cos(np.arange(3602) * (math.pi / 1800)).astype(np.float32)
+
+# Define lookup tables of tan(slope) and cos(3 * slope) at 0.1 degree steps from 0 to 30.1 degrees
+TAN_TABLE = np.tan(np.arange(302) * (math.pi / 1800)).astype(np.float32)
+COS3_TABLE = np.cos(np.arange(302) * (math.pi / 600)).astype(np.float32)
+
+# Define fast math flags without the finite math assumptions so that nan checks are preserved
+FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+
+# Define function to convert a float value to a saturated 16-bit signed integer
+@njit(inline='always')
+def to_int16(value):
+    """
+    Description: truncates a float value to a 16-bit signed integer, clipping to the valid data range
+    Inputs: 'value' -- a float value already offset for rounding
+    Returned Value: Returns a 16-bit signed integer
+    Preconditions: value must not be nan
+    """
+    if value > INT16_MAXIMUM:
+        return np.int16(INT16_MAXIMUM)
+    if value < -INT16_MAXIMUM:
+        return np.int16(-INT16_MAXIMUM)
+    return np.int16(value)
+
+
+# Define function to replace a missing neighbor by reflection through the center cell
+@njit(inline='always')
+def fill_missing(value, opposite, center):
+    """
+    Description: replaces a nan neighbor value by extrapolating from the opposite neighbor through the center cell
+    Inputs: 'value' -- a float value of a neighbor cell
+            'opposite' -- a float value of the neighbor cell opposite across the center cell
+            'center' -- a float value of the center cell
+    Returned Value: Returns the neighbor value, the extrapolated value, or the center value if both neighbors are nan
+    Preconditions: center must not be nan
+    """
+    if not np.isnan(value):
+        return value
+    if not np.isnan(opposite):
+        return 2.0 * center - opposite
+    return center
+
+
+# Define kernel to calculate solar exposure index
+@njit(parallel=True, fastmath=FASTMATH, cache=True, nogil=True)
+def exposure_kernel(aspect, slope, mask, conversion_factor, exposure):
+    """
+    Description: calculates 16-bit signed solar exposure index for a raster block
+    Inputs: 'aspect' -- a 32-bit float array of aspect in degrees with nan as nodata
+            'slope' -- a 32-bit float array of slope in degrees with nan as nodata
+            'mask' -- an 8-bit array of the study area where 0 is outside the area
+            'conversion_factor' -- a float to be multiplied with the output for conversion to integer
+            'exposure' -- a preallocated 16-bit signed integer array to receive the output
+    Returned Value: Returns the output array filled in place
+    Preconditions: requires aligned input and output arrays of equal shape
+    """
+    rows, columns = aspect.shape
+    for i in prange(rows):
+        for j in range(columns):
+            if mask[i, j] == 0 or np.isnan(aspect[i, j]) or np.isnan(slope[i, j]):
+                exposure[i, j] = INT16_NODATA
+            else:
+                # Interpolate cos(aspect - pi) = -cos(aspect) from the lookup table
+                position = min(max(aspect[i, j] * 10.0, 0.0), 3600.0)
+                index = int(position)
+                fraction = position - index
+                cos_aspect = (NEGATIVE_COS_TABLE[index]
+                              + fraction * (NEGATIVE_COS_TABLE[index + 1] - NEGATIVE_COS_TABLE[index]))
+                exposure[i, j] = to_int16(cos_aspect * slope[i, j] * conversion_factor + 0.5)
+    return exposure
+
+
+# Define kernel to calculate surface area ratio
+@njit(parallel=True, fastmath=FASTMATH, cache=True, nogil=True)
+def surface_area_kernel(slope, mask, cell_area, conversion_factor, surface_area):
+    """
+    Description: calculates 16-bit signed surface area ratio as cell area divided by the cosine of slope for a raster block
+    Inputs: 'slope' -- a 32-bit float array of slope in degrees with nan as nodata
+            'mask' -- an 8-bit array of the study area where 0 is outside the area
+            'cell_area' -- a float of the planar area of a cell in squared map units
+            'conversion_factor' -- a float to be multiplied with the output for conversion to integer
+            'surface_area' -- a preallocated 16-bit signed integer array to receive the output
+    Returned Value: Returns the output array filled in place
+    Preconditions: requires aligned input and output arrays of equal shape
+    """
+    rows, columns = slope.shape
+    for i in prange(rows):
+        for j in range(columns):
+            if mask[i, j] == 0 or np.isnan(slope[i, j]):
+                surface_area[i, j] = INT16_NODATA
+            else:
+                ratio = cell_area / math.cos(slope[i, j] * DEG2RAD)
+                surface_area[i, j] = to_int16(ratio * conversion_factor + 0.5)
+    return surface_area
+
+
+# Define kernel to convert a float raster block to a masked 16-bit signed integer block
+@njit(parallel=True, fastmath=FASTMATH, cache=True, nogil=True)
+def clip_mask_kernel(values, mask, scale, output):
+    """
+    Description: scales, rounds, clips, and masks a float raster block to 16-bit signed integers
+    Inputs: 'values' -- a 32-bit float array with nan as nodata
+            'mask' -- an 8-bit array of the study area where 0 is outside the area
+            'scale' -- a float to be multiplied with the values for conversion to integer
+            'output' -- a preallocated 16-bit signed integer array to receive the output
+    Returned Value: Returns the output array filled in place
+    Preconditions: requires aligned input and output arrays of equal shape
+    """
+    rows, columns = values.shape
+    for i in prange(rows):
+        for j in range(columns):
+            if mask[i, j] == 0 or np.isnan(values[i, j]):
+                output[i, j] = INT16_NODATA
+            else:
+                output[i, j] = to_int16(values[i, j] * scale + 0.5)
+    return output
+
+
+# Define kernel to calculate summary statistics of a raster block
+@njit(parallel=True, cache=True, nogil=True)
+def statistics_kernel(values, nodata):
+    """
+    Description: calculates the count, mean, sum of squared deviations, minimum, and maximum of the valid cells in a raster block
+    Inputs: 'values' -- a numeric array of a raster block
+            'nodata' -- a float of the nodata value to exclude
+    Returned Value: Returns a 64-bit float array of count, mean, sum of squared deviations, minimum, and maximum
+    Preconditions: nan values are excluded in addition to the nodata value
+    """
+    rows, columns = values.shape
+    row_count = np.zeros(rows, np.float64)
+    row_sum = np.zeros(rows, np.float64)
+    row_minimum = np.full(rows, np.inf)
+    row_maximum = np.full(rows, -np.inf)
+    # Sum valid values in each row
+    for i in prange(rows):
+        for j in range(columns):
+            value = float(values[i, j])
+            if value != nodata and not np.isnan(value):
+                row_count[i] += 1.0
+                row_sum[i] += value
+                row_minimum[i] = min(row_minimum[i], value)
+                row_maximum[i] = max(row_maximum[i], value)
+    count = row_count.sum()
+    mean = row_sum.sum() / count if count > 0 else 0.0
+    # Sum squared deviations from the block mean in each row
+    row_deviation = np.zeros(rows, np.float64)
+    for i in prange(rows):
+        for j in range(columns):
+            value = float(values[i, j])
+            if value != nodata and not np.isnan(value):
+                row_deviation[i] += (value - mean) * (value - mean)
+    statistics = np.empty(5, np.float64)
+    statistics[0] = count
+    statistics[1] = mean
+    statistics[2] = row_deviation.sum()
+    statistics[3] = row_minimum.min()
+    statistics[4] = row_maximum.max()
+    return statistics
+
+
+# Define kernel to calculate distance to the nearest feature cell in each column
+@njit(parallel=True, cache=True, nogil=True)
+def column_distance_kernel(features):
+    """
+    Description: calculates the number of rows to the nearest feature cell within each column
+    Inputs: 'features' -- a boolean array where true marks a feature cell
+    Returned Value: Returns a 32-bit integer array with -1 where a column contains no feature cells
+    Preconditions: requires a two-dimensional feature array
+    """
+    rows, columns = features.shape
+    distance = np.empty((rows, columns), np.int32)
+    chunk = 64
+    for c in prange((columns + chunk - 1) // chunk):
+        start = c * chunk
+        stop = min(start + chunk, columns)
+        # Sweep down each column
+        for j in range(start, stop):
+            distance[0, j] = 0 if features[0, j] else -1
+        for i in range(1, rows):
+            for j in range(start, stop):
+                if features[i, j]:
+                    distance[i, j] = 0
+                elif distance[i - 1, j] >= 0:
+                    distance[i, j] = distance[i - 1, j] + 1
+                else:
+                    distance[i, j] = -1
+        # Sweep up each column
+        for i in range(rows - 2, -1, -1):
+            for j in range(start, stop):
+                below = distance[i + 1, j]
+                if below >= 0 and (distance[i, j] < 0 or below + 1 < distance[i, j]):
+                    distance[i, j] = below + 1
+    return distance
+
+
+# Define kernel to calculate euclidean distance to the nearest feature cell
+@njit(parallel=True, cache=True, nogil=True)
+def euclidean_distance_kernel(features, cell_size):
+    """
+    Description: calculates 16-bit signed euclidean distance to the nearest feature cell using the lower envelope of parabolas along rows of column distances (Felzenszwalb and Huttenlocher 2012)
+    Inputs: 'features' -- a boolean array where true marks a feature cell
+            'cell_size' -- a float of the cell size in map units
+    Returned Value: Returns a 16-bit signed integer array of distance in map units that saturates at 32767
+    Preconditions: requires a two-dimensional feature array
+    """
+    rows, columns = features.shape
+    column_distance = column_distance_kernel(features)
+    distance = np.empty((rows, columns), np.int16)
+    far = 1e20
+    for i in prange(rows):
+        # Calculate squared column distances for the row
+        squared = np.empty(columns, np.float64)
+        for j in range(columns):
+            d = column_distance[i, j]
+            squared[j] = far if d < 0 else float(d) * d
+        # Calculate lower envelope of parabolas
+        vertex = np.zeros(columns, np.int64)
+        boundary = np.empty(columns + 1, np.float64)
+        k = 0
+        boundary[0] = -np.inf
+        boundary[1] = np.inf
+        for q in range(1, columns):
+            v = vertex[k]
+            s = ((squared[q] + q * q) - (squared[v] + v * v)) / (2.0 * q - 2.0 * v)
+            while s <= boundary[k]:
+                k -= 1
+                v = vertex[k]
+                s = ((squared[q] + q * q) - (squared[v] + v * v)) / (2.0 * q - 2.0 * v)
+            k += 1
+            vertex[k] = q
+            boundary[k] = s
+            boundary[k + 1] = np.inf
+        # Sample lower envelope and convert to integer map units
+        k = 0
+        for q in range(columns):
+            while boundary[k + 1] < q:
+                k += 1
+            v = vertex[k]
+            value = math.sqrt((q - v) * (q - v) + squared[v]) * cell_size
+            distance[i, q] = to_int16(value + 0.5)
+    return distance
+
+
+# Define function to calculate partial derivatives of a quadratic surface
+@njit(inline='always')
+def quadratic_derivatives(elevation, i, j, cell_width, cell_height):
+    """
+    Description: calculates the east and north partial derivatives of a quadratic surface fit to a 3x3 neighborhood (Evans 1980)
+    Inputs: 'elevation' -- a 32-bit float array of elevation with nan as nodata and a 1 cell halo around the tile
+            'i' -- an integer row of the processing cell in the tile without the halo
+            'j' -- an integer column of the processing cell in the tile without the halo
+            'cell_width' -- a float of the cell width in map units
+            'cell_height' -- a float of the cell height in map units
+    Returned Value: Returns the derivatives of elevation to the east and to the north
+    Preconditions: the processing cell must not be nan; missing neighbors are reflected through the center cell
+    """
+    center = elevation[i + 1, j + 1]
+    # Read neighborhood from the north west corner
+    z1 = fill_missing(elevation[i, j], elevation[i + 2, j + 2], center)
+    z2 = fill_missing(elevation[i, j + 1], elevation[i + 2, j + 1], center)
+    z3 = fill_missing(elevation[i, j + 2], elevation[i + 2, j], center)
+    z4 = fill_missing(elevation[i + 1, j], elevation[i + 1, j + 2], center)
+    z6 = fill_missing(elevation[i + 1, j + 2], elevation[i + 1, j], center)
+    z7 = fill_missing(elevation[i + 2, j], elevation[i, j + 2], center)
+    z8 = fill_missing(elevation[i + 2, j + 1], elevation[i, j + 1], center)
+    z9 = fill_missing(elevation[i + 2, j + 2], elevation[i, j], center)
+    dz_dx = ((z3 + z6 + z9) - (z1 + z4 + z7)) / (6.0 * cell_width)
+    dz_dy = ((z1 + z2 + z3) - (z7 + z8 + z9)) / (6.0 * cell_height)
+    return dz_dx, dz_dy
+
+
+# Define kernel to calculate float and integer aspect
+@njit(parallel=True, fastmath=FASTMATH, cache=True, nogil=True)
+def aspect_kernel(elevation, mask, cell_width, cell_height, convergence, aspect, aspect_integer):
+    """
+    Description: calculates aspect in degrees from north from a quadratic surface fit to each 3x3 neighborhood (Evans 1980), adjusting grid azimuths to geodesic azimuths by the grid convergence
+    Inputs: 'elevation' -- a 32-bit float array of elevation with nan as nodata and a 1 cell halo around the tile
+            'mask' -- an 8-bit array of the study area where 0 is outside the area
+            'cell_width' -- a float of the cell width in map units
+            'cell_height' -- a float of the cell height in map units
+            'convergence' -- a 2x2 float array of the grid azimuth of geodesic north in degrees at the tile corners
+            'aspect' -- a preallocated 32-bit float array to receive aspect in degrees, with -1 for flat cells
+            'aspect_integer' -- a preallocated 16-bit signed integer array to receive aspect extracted to area
+    Returned Value: Returns the float aspect array filled in place
+    Preconditions: missing neighbors are reflected through the center cell
+    """
+    rows, columns = aspect.shape
+    row_step = 1.0 / (rows - 1) if rows > 1 else 0.0
+    column_step = 1.0 / (columns - 1) if columns > 1 else 0.0
+    for i in prange(rows):
+        for j in range(columns):
+            center = elevation[i + 1, j + 1]
+            if np.isnan(center):
+                aspect[i, j] = FLOAT_NODATA
+                aspect_integer[i, j] = INT16_NODATA
+                continue
+            dz_dx, dz_dy = quadratic_derivatives(elevation, i, j, cell_width, cell_height)
+            if dz_dx == 0.0 and dz_dy == 0.0:
+                value = -1.0
+            else:
+                # Interpolate grid convergence and convert downslope grid azimuth to geodesic azimuth
+                row_weight = i * row_step
+                column_weight = j * column_step
+                north = ((1 - row_weight) * ((1 - column_weight) * convergence[0, 0]
+                                             + column_weight * convergence[0, 1])
+                         + row_weight * ((1 - column_weight) * convergence[1, 0]
+                                         + column_weight * convergence[1, 1]))
+                value = (math.atan2(-dz_dx, -dz_dy) / DEG2RAD - north) % 360.0
+            aspect[i, j] = value
+            aspect_integer[i, j] = INT16_NODATA if mask[i, j] == 0 else to_int16(value + 0.5)
+    return aspect
+
+
+# Define kernel to calculate float and integer slope
+@njit(parallel=True, fastmath=FASTMATH, cache=True, nogil=True)
+def slope_kernel(elevation, mask, cell_width, cell_height, z_factor, slope, slope_integer):
+    """
+    Description: calculates slope in degrees from a quadratic surface fit to each 3x3 neighborhood (Evans 1980)
+    Inputs: 'elevation' -- a 32-bit float array of elevation with nan as nodata and a 1 cell halo around the tile
+            'mask' -- an 8-bit array of the study area where 0 is outside the area
+            'cell_width' -- a float of the cell width in map units
+            'cell_height' -- a float of the cell height in map units
+            'z_factor' -- a float to convert elevation units to map units
+            'slope' -- a preallocated 32-bit float array to receive slope in degrees
+            'slope_integer' -- a preallocated 16-bit signed integer array to receive slope extracted to area
+    Returned Value: Returns the float slope array filled in place
+    Preconditions: missing neighbors are reflected through the center cell
+    """
+    rows, columns = slope.shape
+    for i in prange(rows):
+        for j in range(columns):
+            if np.isnan(elevation[i + 1, j + 1]):
+                slope[i, j] = FLOAT_NODATA
+                slope_integer[i, j] = INT16_NODATA
+                continue
+            dz_dx, dz_dy = quadratic_derivatives(elevation, i, j, cell_width, cell_height)
+            value = math.atan(z_factor * math.sqrt(dz_dx * dz_dx + dz_dy * dz_dy)) / DEG2RAD
+            slope[i, j] = value
+            slope_integer[i, j] = INT16_NODATA if mask[i, j] == 0 else to_int16(value + 0.5)
+    return slope
+
+
+# Define kernel to calculate summed area tables of a raster block
+@njit(parallel=True, cache=True, nogil=True)
+def integral_kernel(values):
+    """
+    Description: calculates summed area tables of the valid values and of the count of valid cells in a raster block
+    Inputs: 'values' -- a 32-bit float array with nan as nodata
+    Returned Value: Returns a 64-bit float table of sums and a 32-bit integer table of counts, each with a leading row and column of zeros
+    Preconditions: nan values are excluded from sums and counts
+    """
+    rows, columns = values.shape
+    sums = np.zeros((rows + 1, columns + 1), np.float64)
+    counts = np.zeros((rows + 1, columns + 1), np.int32)
+    # Accumulate along rows
+    for i in prange(rows):
+        for j in range(columns):
+            value = values[i, j]
+            valid = not np.isnan(value)
+            sums[i + 1, j + 1] = sums[i + 1, j] + (value if valid else 0.0)
+            counts[i + 1, j + 1] = counts[i + 1, j] + (1 if valid else 0)
+    # Accumulate along columns
+    for j in prange(1, columns + 1):
+        for i in range(1, rows + 1):
+            sums[i, j] += sums[i - 1, j]
+            counts[i, j] += counts[i - 1, j]
+    return sums, counts
+
+
+# Define function to sum a rectangle of a summed area table
+@njit(inline='always')
+def box_sum(table, top, left, bottom, right):
+    """
+    Description: sums the cells of a rectangle from the four corners of a summed area table
+    Inputs: 'table' -- a summed area table with a leading row and column of zeros
+            'top' -- an integer row of the table above the rectangle
+            'left' -- an integer column of the table left of the rectangle
+            'bottom' -- an integer last row of the table in the rectangle
+            'right' -- an integer last column of the table in the rectangle
+    Returned Value: Returns the sum of the rectangle
+    Preconditions: requires table indices from integral_kernel or moment_integral_kernel
+    """
+    return table[bottom, right] - table[top, right] - table[bottom, left] + table[top, left]
+
+
+# Define kernel to calculate topographic position
+@njit(parallel=True, fastmath=FASTMATH, cache=True, nogil=True)
+def position_kernel(elevation, mask, before, after, position):
+    """
+    Description: calculates 16-bit signed topographic position as elevation minus the mean elevation of valid cells in a rectangular neighborhood
+    Inputs: 'elevation' -- a 32-bit float array of elevation with nan as nodata and a halo of 'after' cells around the tile
+            'mask' -- an 8-bit array of the study area where 0 is outside the area
+            'before' -- an integer number of neighborhood cells above and left of the processing cell
+            'after' -- an integer number of neighborhood cells below and right of the processing cell
+            'position' -- a preallocated 16-bit signed integer array to receive the output
+    Returned Value: Returns the output array filled in place
+    Preconditions: requires 'after' to be at least 'before'
+    """
+    rows, columns = position.shape
+    sums, counts = integral_kernel(elevation)
+    for i in prange(rows):
+        top = i + after - before
+        bottom = i + 2 * after + 1
+        for j in range(columns):
+            center = elevation[i + after, j + after]
+            if mask[i, j] == 0 or np.isnan(center):
+                position[i, j] = INT16_NODATA
+                continue
+            left = j + after - before
+            right = j + 2 * after + 1
+            # Sum the neighborhood from four corners of the summed area tables
+            total = box_sum(sums, top, left, bottom, right)
+            count = box_sum(counts, top, left, bottom, right)
+            position[i, j] = to_int16(center - total / count + 0.5)
+    return position
+
+
+# Define kernel to calculate summed area tables of shifted values and squares of a raster block
+@njit(parallel=True, cache=True, nogil=True)
+def moment_integral_kernel(values, shift):
+    """
+    Description: calculates summed area tables of the valid values and squared values after subtracting a shift, and of the count of valid cells in a raster block
+    Inputs: 'values' -- a 32-bit float array with nan as nodata
+            'shift' -- a float subtracted from each value to limit cancellation in the squared sums
+    Returned Value: Returns 64-bit float tables of sums and squared sums and a 32-bit integer table of counts, each with a leading row and column of zeros
+    Preconditions: nan values are excluded from sums and counts
+    """
+    rows, columns = values.shape
+    sums = np.zeros((rows + 1, columns + 1), np.float64)
+    squares = np.zeros((rows + 1, columns + 1), np.float64)
+    counts = np.zeros((rows + 1, columns + 1), np.int32)
+    # Accumulate along rows
+    for i in prange(rows):
+        for j in range(columns):
+            value = values[i, j]
+            valid = not np.isnan(value)
+            deviation = value - shift if valid else 0.0
+            sums[i + 1, j + 1] = sums[i + 1, j] + deviation
+            squares[i + 1, j + 1] = squares[i + 1, j] + deviation * deviation
+            counts[i + 1, j + 1] = counts[i + 1, j] + (1 if valid else 0)
+    # Accumulate along columns
+    for j in prange(1, columns + 1):
+        for i in range(1, rows + 1):
+            sums[i, j] += sums[i - 1, j]
+            squares[i, j] += squares[i - 1, j]
+            counts[i, j] += counts[i - 1, j]
+    return sums, squares, counts
+
+
+# Define kernel to calculate roughness
+@njit(parallel=True, fastmath=FASTMATH, cache=True, nogil=True)
+def roughness_kernel(elevation, mask, radius, conversion_factor, roughness):
+    """
+    Description: calculates 16-bit signed roughness as the variance of valid elevation cells in a square neighborhood
+    Inputs: 'elevation' -- a 32-bit float array of elevation with nan as nodata and a halo of 'radius' cells around the tile
+            'mask' -- an 8-bit array of the study area where 0 is outside the area
+            'radius' -- an integer number of neighborhood cells on each side of the processing cell
+            'conversion_factor' -- a float to be multiplied with the output for conversion to integer
+            'roughness' -- a preallocated 16-bit signed integer array to receive the output
+    Returned Value: Returns the output array filled in place
+    Preconditions: neighborhoods without valid cells are set to 0
+    """
+    rows, columns = roughness.shape
+    # Shift values by the first valid elevation of the block
+    shift = 0.0
+    for k in range(elevation.size):
+        value = elevation.flat[k]
+        if not np.isnan(value):
+            shift = value
+            break
+    sums, squares, counts = moment_integral_kernel(elevation, shift)
+    width = 2 * radius + 1
+    for i in prange(rows):
+        for j in range(columns):
+            if mask[i, j] == 0:
+                roughness[i, j] = INT16_NODATA
+                continue
+            # Sum the neighborhood from four corners of the summed area tables
+            count = box_sum(counts, i, j, i + width, j + width)
+            if count == 0:
+                roughness[i, j] = 0
+                continue
+            total = box_sum(sums, i, j, i + width, j + width)
+            total_square = box_sum(squares, i, j, i + width, j + width)
+            mean = total / count
+            variance = max(total_square / count - mean * mean, 0.0)
+            roughness[i, j] = to_int16(variance * conversion_factor + 0.5)
+    return roughness
+
+
+# Define function to calculate the wetness index of a cell
+@njit(inline='always')
+def wetness_index(degree, flow, cell_size):
+    """
+    Description: divides corrected flow accumulation by the slope tangent and weights the log ratio by the cosine of three times slope
+    Inputs: 'degree' -- a float of smoothed slope in degrees
+            'flow' -- a float of flow accumulation with nan as nodata
+            'cell_size' -- a float of the cell size in map units
+    Returned Value: Returns the float wetness index
+    Preconditions: slopes of 30 degrees or more return 0 and missing flow accumulation is treated as 0
+    """
+    if degree >= 30.0:
+        return 0.0
+    flow = 0.0 if np.isnan(flow) else max(flow, 0.0)
+    # Interpolate tan(slope) and cos(3 * slope) from the lookup tables
+    position = max(degree * 10.0, 0.0)
+    index = int(position)
+    fraction = position - index
+    tangent = TAN_TABLE[index] + fraction * (TAN_TABLE[index + 1] - TAN_TABLE[index]) if degree > 0 else 0.001
+    cos_slope = COS3_TABLE[index] + fraction * (COS3_TABLE[index + 1] - COS3_TABLE[index])
+    return math.log((flow + 1) * cell_size / tangent) * cos_slope
+
+
+# Define kernel to calculate topographic wetness
+@njit(parallel=True, fastmath=FASTMATH, cache=True, nogil=True)
+def wetness_kernel(slope, accumulation, mask, before, after, cell_size, conversion_factor, wetness):
+    """
+    Description: calculates 16-bit signed topographic wetness from flow accumulation and slope smoothed by the mean of valid cells in a rectangular neighborhood, weighted by the cosine of three times slope
+    Inputs: 'slope' -- a 32-bit float array of slope in degrees with nan as nodata and a halo of 'after' cells around the tile
+            'accumulation' -- a 32-bit float array of flow accumulation with nan as nodata
+            'mask' -- an 8-bit array of the study area where 0 is outside the area
+            'before' -- an integer number of neighborhood cells above and left of the processing cell
+            'after' -- an integer number of neighborhood cells below and right of the processing cell
+            'cell_size' -- a float of the cell size in map units
+            'conversion_factor' -- a float to be multiplied with the output for conversion to integer
+            'wetness' -- a preallocated 16-bit signed integer array to receive the output
+    Returned Value: Returns the output array filled in place
+    Preconditions: slopes of 30 degrees or more are set to 0 and missing flow accumulation is treated as 0
+    """
+    rows, columns = wetness.shape
+    sums, counts = integral_kernel(slope)
+    for i in prange(rows):
+        top = i + after - before
+        bottom = i + 2 * after + 1
+        for j in range(columns):
+            left = j + after - before
+            right = j + 2 * after + 1
+            # Smooth slope from four corners of the summed area tables
+            count = box_sum(counts, top, left, bottom, right)
+            if mask[i, j] == 0 or count == 0:
+                wetness[i, j] = INT16_NODATA
+                continue
+            degree = box_sum(sums, top, left, bottom, right) / count
+            index = wetness_index(degree, accumulation[i, j], cell_size)
+            wetness[i, j] = to_int16(index * conversion_factor + 0.5)
+    return wetness
+
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Raster post-processing
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-14
+# Usage: Execute in ArcGIS Pro Python 3.9+.
+# Description: "Raster post-processing" contains a function that builds pyramids and statistics for rasters exported by arcpy.
+# ---------------------------------------------------------------------------
+
+# Import packages
+import math
+
+# Import arcpy packages if available
+try:
+    import arcpy
+    from arcpy.sa import Raster
+except ImportError:
+    arcpy = None
+
+
+# Define the number of cells sampled along the longest raster side for statistics
+STATISTICS_SAMPLE = 4096
+
+
+# Define function to build pyramids and statistics
+def finalize_raster(raster_path):
+    """
+    Description: builds pyramids and calculates statistics sampled with skip factors for a raster on disk
+    Inputs: 'raster_path' -- a file path for an exported raster
+    Returned Value: Returns the raster file path after pyramids and statistics are written
+    Preconditions: requires a closed raster on disk
+    """
+
+    # Build pyramids
+    arcpy.management.BuildPyramids(raster_path,
+                                   '-1',
+                                   'NONE',
+                                   'BILINEAR',
+                                   'LZ77',
+                                   '',
+                                   'OVERWRITE')
+
+    # Sample statistics with skip factors sized to the raster dimensions
+    raster = Raster(raster_path)
+    skip_factor = max(1, math.ceil(max(raster.width, raster.height) / STATISTICS_SAMPLE))
+    arcpy.management.CalculateStatistics(raster_path,
+                                         skip_factor,
+                                         skip_factor,
+                                         '',
+                                         'OVERWRITE')
+    return raster_path
@@ -0,0 +1,412 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Raster input and output helpers
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-14
+# Usage: Requires numpy, numba, and rasterio.
+# Description: "Raster input and output helpers" contains functions to describe a study area, to tile a study area grid, to read input raster blocks aligned to the grid while the previous block is processed, to write output blocks while the next block is processed, to calculate grid convergence and elevation unit conversion, to accumulate and write statistics of written blocks, to build internal overviews, to define tiled output raster profiles, and to convert float rasters to 16-bit signed rasters.
+# ---------------------------------------------------------------------------
+
+# Import packages
+import concurrent.futures
+import contextlib
+import functools
+import math
+import os
+import numpy as np
+import rasterio
+from rasterio.enums import Resampling
+from rasterio.warp import transform
+from rasterio.windows import Window
+from akgeomorph._kernels import clip_mask_kernel
+from akgeomorph._kernels import statistics_kernel
+
+
+# Define function to read study area properties once per file version
+@functools.lru_cache(maxsize=16)
+def _describe_area(area_path, modified_time):
+    """
+    Description: reads the cell size and bounds of a study area raster
+    Inputs: 'area_path' -- an absolute file path for a study area raster
+            'modified_time' -- a float modification time of the file that invalidates cached properties
+    Returned Value: Returns a tuple of cell size and a tuple of minimum x, minimum y, maximum x, and maximum y
+    Preconditions: requires an existing study area raster
+    """
+
+    # Read raster properties
+    with rasterio.open(area_path) as area_raster:
+        return abs(area_raster.transform.a), tuple(area_raster.bounds)
+
+
+# Define function to describe a study area raster
+def describe_area(area_input):
+    """
+    Description: returns the cached cell size and bounds of a study area raster
+    Inputs: 'area_input' -- a raster of the study area
+    Returned Value: Returns a tuple of cell size and a tuple of minimum x, minimum y, maximum x, and maximum y
+    Preconditions: requires an existing study area raster
+    """
+
+    # Look up properties by path and modification time
+    area_path = os.path.abspath(area_input)
+    return _describe_area(area_path, os.path.getmtime(area_path))
+
+
+# Define function to read a raster block aligned to a reference grid
+def read_aligned(src, ref, window):
+    """
+    Description: reads a block of a raster that shares the cell size and snap of a reference raster
+    Inputs: 'src' -- an open rasterio dataset to read
+            'ref' -- an open rasterio dataset that defines the grid of the window
+            'window' -- a rasterio window in the grid of the reference dataset
+    Returned Value: Returns a 32-bit float array with nodata values as nan
+    Preconditions: requires the input rasters to share coordinate system, cell size, and snap, otherwise raises a ValueError
+    """
+
+    # Check that the source grid matches the reference grid
+    if src.crs != ref.crs:
+        raise ValueError(f'{src.name} does not share the coordinate system of {ref.name}')
+    if not all(math.isclose(src_size, ref_size, rel_tol=1e-9) for src_size, ref_size in zip(src.res, ref.res)):
+        raise ValueError(f'{src.name} does not share the cell size of {ref.name}')
+    column_shift = (ref.transform.c - src.transform.c) / src.transform.a
+    row_shift = (ref.transform.f - src.transform.f) / src.transform.e
+    if abs(column_shift - round(column_shift)) > 1e-6 or abs(row_shift - round(row_shift)) > 1e-6:
+        raise ValueError(f'{src.name} does not share the snap of {ref.name}')
+
+    # Translate window from reference grid to source grid
+    column_offset = int(round(column_shift))
+    row_offset = int(round(row_shift))
+    src_window = Window(window.col_off + column_offset,
+                        window.row_off + row_offset,
+                        window.width,
+                        window.height)
+
+    # Read block, only using a boundless read where the window extends past the source
+    boundless = (src_window.col_off < 0
+                 or src_window.row_off < 0
+                 or src_window.col_off + src_window.width > src.width
+                 or src_window.row_off + src_window.height > src.height)
+    block = src.read(1, window=src_window, boundless=boundless, masked=True, out_dtype='float32')
+    return block.filled(np.nan)
+
+
+# Define function to generate a tiling grid
+def tile_grid(height, width, size=512, overlap=0):
+    """
+    Description: generates a grid of tiles covering a raster with an optional halo of cells around each tile
+    Inputs: 'height' -- an integer number of rows in the raster
+            'width' -- an integer number of columns in the raster
+            'size' -- an integer tile edge length in cells
+            'overlap' -- an integer number of halo cells to read around each tile
+    Returned Value: Returns a list of tuples of read window and write window, where the write window is the read window without the halo
+    Preconditions: read windows along the raster edges extend past the raster and must be read as boundless
+    """
+
+    # Create read and write windows for each tile
+    tiles = []
+    for row in range(0, height, size):
+        for column in range(0, width, size):
+            rows = min(size, height - row)
+            columns = min(size, width - column)
+            write_window = Window(column, row, columns, rows)
+            read_window = Window(column - overlap, row - overlap, columns + 2 * overlap, rows + 2 * overlap)
+            tiles.append((read_window, write_window))
+    return tiles
+
+
+# Define function to read blocks ahead of processing
+def prefetch_blocks(read_block, tiles):
+    """
+    Description: reads the next tile on a background thread while the current tile is processed
+    Inputs: 'read_block' -- a function that reads and returns the input blocks for a tile
+            'tiles' -- a list of tiles to read
+    Returned Value: Yields each tile with the result of reading it, in order
+    Preconditions: read_block must only read from datasets that are not used on the calling thread until iteration ends
+    """
+
+    # Read each tile one step ahead of the consumer
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(read_block, tiles[0]) if tiles else None
+        for index, tile in enumerate(tiles):
+            blocks = future.result()
+            if index + 1 < len(tiles):
+                future = executor.submit(read_block, tiles[index + 1])
+            yield tile, blocks
+
+
+# Define context manager to write blocks behind processing
+@contextlib.contextmanager
+def write_behind(dataset, size, dtype):
+    """
+    Description: accumulates the statistics of each block and writes it on a background thread while the next block is calculated, alternating between two reused output buffers, then writes statistics and internal pyramids
+    Inputs: 'dataset' -- an open rasterio dataset in write mode, or None to discard blocks
+            'size' -- an integer tile edge length in cells
+            'dtype' -- a numpy data type of the output
+    Returned Value: Yields a function that returns a free output block for a write window and a function that submits a filled output block for writing
+    Preconditions: the dataset must not be used on the calling thread until the context exits, and statistics are accumulated on the calling thread so that parallel kernels never run concurrently
+    """
+
+    # Create two output buffers and a background writer
+    buffers = [np.empty((size, size), dtype), np.empty((size, size), dtype)]
+    futures = [None, None]
+    state = {'index': 0, 'statistics': None}
+
+    # Define function to write a block
+    def write_block(block, window):
+        dataset.write(block, 1, window=window)
+
+    # Define function to return a free output block
+    def output_block(window):
+        index = state['index'] % 2
+        if futures[index] is not None:
+            futures[index].result()
+        return buffers[index][:window.height, :window.width]
+
+    # Define function to submit a filled output block
+    def submit_block(block, window):
+        if dataset is not None:
+            state['statistics'] = update_statistics(state['statistics'], block, dataset.nodata)
+            futures[state['index'] % 2] = executor.submit(write_block, block, window)
+        state['index'] += 1
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        yield output_block, submit_block
+        for future in futures:
+            if future is not None:
+                future.result()
+
+    # Write statistics and build internal pyramids
+    if dataset is not None:
+        write_statistics(dataset, state['statistics'])
+        build_overviews(dataset)
+
+
+# Define function to calculate grid convergence at the corners of a tile
+def grid_convergence(ref, window):
+    """
+    Description: calculates the grid azimuth of geodesic north at the corner cell centers of a window
+    Inputs: 'ref' -- an open rasterio dataset in a projected coordinate system
+            'window' -- a rasterio window in the grid of the reference dataset
+    Returned Value: Returns a 2x2 float array of azimuths in degrees clockwise from grid north
+    Preconditions: requires a projected coordinate system
+    """
+
+    # Find corner cell centers
+    rows = [window.row_off, window.row_off + window.height - 1]
+    columns = [window.col_off, window.col_off + window.width - 1]
+    x = [ref.transform.c + (column + 0.5) * ref.transform.a for row in rows for column in columns]
+    y = [ref.transform.f + (row + 0.5) * ref.transform.e for row in rows for column in columns]
+
+    # Step north along the meridian through each corner and measure the grid azimuth of the step
+    longitude, latitude = transform(ref.crs, 'EPSG:4326', x, y)
+    north_x, north_y = transform('EPSG:4326', ref.crs, longitude, [value + 0.0001 for value in latitude])
+    azimuth = np.degrees(np.arctan2(np.subtract(north_x, x), np.subtract(north_y, y)))
+    return azimuth.reshape(2, 2)
+
+
+# Define function to calculate the conversion from elevation units to map units
+def z_factor(ref, z_unit):
+    """
+    Description: calculates the factor that converts elevation units to the linear units of a raster coordinate system
+    Inputs: 'ref' -- an open rasterio dataset in a projected coordinate system
+            'z_unit' -- a string of the elevation unit using the arcpy linear unit names, such as 'METER' or 'FOOT'
+    Returned Value: Returns a float factor
+    Preconditions: requires a projected coordinate system
+    """
+
+    # Define linear units in meters
+    unit_meters = {'INCH': 0.0254,
+                   'FOOT': 0.3048,
+                   'YARD': 0.9144,
+                   'MILE_US': 1609.347218694437,
+                   'NAUTICAL_MILE': 1852.0,
+                   'MILLIMETER': 0.001,
+                   'CENTIMETER': 0.01,
+                   'DECIMETER': 0.1,
+                   'METER': 1.0,
+                   'KILOMETER': 1000.0}
+
+    # Divide elevation unit by map unit
+    return unit_meters[z_unit.upper()] / ref.crs.linear_units_factor[1]
+
+
+# Define function to accumulate summary statistics of written blocks
+def update_statistics(totals, block, nodata):
+    """
+    Description: combines the summary statistics of a raster block with the statistics of previous blocks (Chan et al. 1979)
+    Inputs: 'totals' -- a list of count, mean, sum of squared deviations, minimum, and maximum of previous blocks or None
+            'block' -- a numeric array of a raster block
+            'nodata' -- a float of the nodata value to exclude
+    Returned Value: Returns the combined list of count, mean, sum of squared deviations, minimum, and maximum
+    Preconditions: returns None until a block contains valid cells
+    """
+
+    # Calculate block statistics
+    count, mean, deviation, minimum, maximum = statistics_kernel(block, float(nodata))
+    if count == 0:
+        return totals
+    if totals is None:
+        return [count, mean, deviation, minimum, maximum]
+
+    # Combine block statistics with previous statistics
+    total_count, total_mean, total_deviation, total_minimum, total_maximum = totals
+    combined_count = total_count + count
+    delta = mean - total_mean
+    return [combined_count,
+            total_mean + delta * count / combined_count,
+            total_deviation + deviation + delta * delta * total_count * count / combined_count,
+            min(total_minimum, minimum),
+            max(total_maximum, maximum)]
+
+
+# Define function to write summary statistics to a raster
+def write_statistics(dataset, totals):
+    """
+    Description: writes accumulated summary statistics as raster band metadata so that statistics do not need to be recalculated
+    Inputs: 'dataset' -- an open rasterio dataset in write mode
+            'totals' -- a list of count, mean, sum of squared deviations, minimum, and maximum or None
+    Returned Value: Returns the dataset with statistics metadata
+    Preconditions: writes no statistics if no valid cells were accumulated
+    """
+
+    # Write statistics tags for the first band
+    if totals is not None:
+        count, mean, deviation, minimum, maximum = totals
+        dataset.update_tags(1,
+                            STATISTICS_MINIMUM=repr(float(minimum)),
+                            STATISTICS_MAXIMUM=repr(float(maximum)),
+                            STATISTICS_MEAN=repr(float(mean)),
+                            STATISTICS_STDDEV=repr(math.sqrt(deviation / count)))
+    return dataset
+
+
+# Define function to build internal overviews
+def build_overviews(dataset):
+    """
+    Description: builds internal bilinear overviews at successive factors of 2 until the coarsest overview fits in one tile
+    Inputs: 'dataset' -- an open rasterio dataset in write mode
+    Returned Value: Returns the dataset with internal overviews
+    Preconditions: all blocks of the dataset must be written
+    """
+
+    # Determine overview factors
+    factors = []
+    factor = 2
+    while max(dataset.width, dataset.height) / (factor / 2) > 512:
+        factors.append(factor)
+        factor *= 2
+
+    # Build overviews
+    if factors:
+        dataset.build_overviews(factors, Resampling.bilinear)
+        dataset.update_tags(ns='rio_overview', resampling='bilinear')
+    return dataset
+
+
+# Define function to create a 16-bit signed output profile
+def int16_profile(ref):
+    """
+    Description: creates a tiled 16-bit signed raster profile that matches the grid of a reference raster
+    Inputs: 'ref' -- an open rasterio dataset that defines the output grid
+    Returned Value: Returns a rasterio profile dictionary
+    Preconditions: requires an open reference raster
+    """
+
+    # Copy reference profile and update output settings
+    profile = ref.profile.copy()
+    profile.update(driver='GTiff',
+                   count=1,
+                   dtype='int16',
+                   nodata=-32768,
+                   compress='lzw',
+                   predictor=2,
+                   tiled=True,
+                   blockxsize=512,
+                   blockysize=512,
+                   BIGTIFF='IF_SAFER',
+                   num_threads='ALL_CPUS')
+    return profile
+
+
+# Define function to create a 32-bit float output profile
+def float32_profile(ref):
+    """
+    Description: creates a tiled 32-bit float raster profile that matches the grid of a reference raster
+    Inputs: 'ref' -- an open rasterio dataset that defines the output grid
+    Returned Value: Returns a rasterio profile dictionary
+    Preconditions: requires an open reference raster
+    """
+
+    # Copy reference profile and update output settings
+    profile = ref.profile.copy()
+    profile.update(driver='GTiff',
+                   count=1,
+                   dtype='float32',
+                   nodata=-2147483648,
+                   compress='lzw',
+                   predictor=3,
+                   tiled=True,
+                   blockxsize=512,
+                   blockysize=512,
+                   BIGTIFF='IF_SAFER',
+                   num_threads='ALL_CPUS')
+    return profile
+
+
+# Define function to create a 1-bit output profile
+def bit_profile(ref):
+    """
+    Description: creates a tiled 1-bit raster profile that matches the grid of a reference raster
+    Inputs: 'ref' -- an open rasterio dataset that defines the output grid
+    Returned Value: Returns a rasterio profile dictionary with 0 as nodata
+    Preconditions: requires an open reference raster
+    """
+
+    # Copy reference profile and update output settings
+    profile = ref.profile.copy()
+    profile.update(driver='GTiff',
+                   count=1,
+                   dtype='uint8',
+                   nodata=0,
+                   nbits=1,
+                   compress='packbits',
+                   tiled=True,
+                   blockxsize=512,
+                   blockysize=512,
+                   BIGTIFF='IF_SAFER',
+                   num_threads='ALL_CPUS')
+    return profile
+
+
+# Define function to convert a float raster to a 16-bit signed raster
+def to_int16_tiled(in_path, out_path, mask_path=None, scale=1.0):
+    """
+    Description: scales, rounds, and extracts a float raster to a 16-bit signed raster block by block and writes its statistics and pyramids
+    Inputs: 'in_path' -- a file path for an input float raster
+            'out_path' -- a file path for an output 16-bit signed raster
+            'mask_path' -- [optional] a raster of the study area to set the output grid and extract area
+            'scale' -- a float to be multiplied with the input for conversion to integer
+    Returned Value: Returns a raster dataset on disk
+    Preconditions: requires the input and study area rasters to share cell size and snap
+    """
+
+    # Use the input raster as the study area if no mask is provided
+    if mask_path is None:
+        mask_path = in_path
+
+    # Convert blocks to integer and extract to area
+    with rasterio.open(mask_path) as area_raster, \
+            rasterio.open(in_path) as input_raster, \
+            rasterio.open(out_path, 'w', **int16_profile(area_raster)) as output_raster:
+        # Define function to read aligned input blocks
+        def read_block(tile):
+            read_window, write_window = tile
+            return area_raster.read_masks(1, window=write_window), read_aligned(input_raster, area_raster, write_window)
+
+        # Convert each block while the next block is read and the previous block is written
+        with write_behind(output_raster, 512, np.int16) as (output_block, submit_block):
+            for (read_window, write_window), (area_mask, input_block) in prefetch_blocks(
+                    read_block, tile_grid(area_raster.height, area_raster.width, size=512)):
+                block = output_block(write_window)
+                clip_mask_kernel(input_block, area_mask, float(scale), block)
+                submit_block(block, write_window)
@@ -2,110 +2,62 @@
 # ---------------------------------------------------------------------------
 # Calculate aspect
 # Author: Timm Nawrocki
-# Last Updated: 2024-05-04
-# Usage: Execute in ArcGIS Pro Python 3.9+.
+# Last Updated: 2026-10-14
+# Usage: Requires numpy, numba, and rasterio.
 # Description: "Calculate aspect" is a function that calculates float and integer aspect.
 # ---------------------------------------------------------------------------
 
+# Import packages
+import contextlib
+import numpy as np
+import rasterio
+from akgeomorph._kernels import aspect_kernel
+from akgeomorph._rast import float32_profile
+from akgeomorph._rast import grid_convergence
+from akgeomorph._rast import int16_profile
+from akgeomorph._rast import prefetch_blocks
+from akgeomorph._rast import read_aligned
+from akgeomorph._rast import tile_grid
+from akgeomorph._rast import write_behind
+
+
 # Define function to calculate aspect
 def calculate_aspect(area_input, elevation_input, z_unit, aspect_float, aspect_output):
     """
     Description: calculates 32-bit float raw aspect and 16-bit signed aspect
     Inputs: 'area_input' -- a raster of the study area to set snap raster and extract area
             'elevation_input' -- an input 32-bit float elevation raster
+            'z_unit' -- a string of the elevation unit, which does not change aspect
             'aspect_float' -- a file path for an output 32-bit float aspect raster in degrees
             'aspect_output' -- [optional] a file path for an output 16-bit integer aspect raster in degrees
     Returned Value: Returns a raster dataset on disk
-    Preconditions: requires float input elevation raster
+    Preconditions: requires float input elevation raster in a projected coordinate system that shares cell size and snap with the study area
     """
 
-    # Import packages
-    import arcpy
-    from arcpy.sa import ExtractByMask
-    from arcpy.sa import Int
-    from arcpy.sa import Raster
-    from arcpy.sa import SurfaceParameters
-
-    # Set overwrite option
-    arcpy.env.overwriteOutput = True
-
-    # Specify core usage
-    arcpy.env.parallelProcessingFactor = "75%"
-
-    # Set snap raster and extent
-    area_raster = Raster(area_input)
-    arcpy.env.snapRaster = area_raster
-    arcpy.env.extent = area_raster.extent
-
-    # Set cell size environment
-    cell_size = arcpy.management.GetRasterProperties(area_raster, 'CELLSIZEX', '').getOutput(0)
-    arcpy.env.cellSize = int(cell_size)
-
-    # Calculate raw aspect in degrees
-    print('\tCalculating raw aspect...')
-    aspect_raster = SurfaceParameters(elevation_input,
-                                      'ASPECT',
-                                      'QUADRATIC',
-                                      cell_size,
-                                      'FIXED_NEIGHBORHOOD',
-                                      z_unit,
-                                      '',
-                                      'GEODESIC_AZIMUTHS',
-                                      'NORTH_POLE_ASPECT')
-
-    # Export rasters
-    print('\tExporting aspect as 32-bit float raster...')
-    arcpy.management.CopyRaster(aspect_raster,
-                                aspect_float,
-                                '',
-                                '0',
-                                '-2147483648',
-                                'NONE',
-                                'NONE',
-                                '32_BIT_FLOAT',
-                                'NONE',
-                                'NONE',
-                                'TIFF',
-                                'NONE',
-                                'CURRENT_SLICE',
-                                'NO_TRANSPOSE')
-    arcpy.management.BuildPyramids(aspect_float,
-                                   '-1',
-                                   'NONE',
-                                   'BILINEAR',
-                                   'LZ77',
-                                   '',
-                                   'OVERWRITE')
-    arcpy.management.CalculateStatistics(aspect_float)
-
-    # Create integer aspect if file is specified
-    if aspect_output != None:
-        # Convert to integer
-        print('\tConverting to integer...')
-        integer_raster = Int(aspect_raster + 0.5)
-
-        # Extract to area raster
-        print('\tExtracting raster to area...')
-        extract_integer = ExtractByMask(integer_raster, area_raster)
-
-        print('\tExporting aspect as 16-bit integer raster...')
-        arcpy.management.CopyRaster(extract_integer,
-                                    aspect_output,
-                                    '',
-                                    '32767',
-                                    '-32768',
-                                    'NONE',
-                                    'NONE',
-                                    '16_BIT_SIGNED',
-                                    'NONE',
-                                    'NONE',
-                                    'TIFF',
-                                    'NONE')
-        arcpy.management.BuildPyramids(aspect_output,
-                                       '-1',
-                                       'NONE',
-                                       'BILINEAR',
-                                       'LZ77',
-                                       '',
-                                       'OVERWRITE')
-        arcpy.management.CalculateStatistics(aspect_output)
+    # Calculate aspect in degrees block by block
+    print('\tCalculating and exporting aspect...')
+    with rasterio.open(area_input) as area_raster, \
+            rasterio.open(elevation_input) as elevation_raster, \
+            rasterio.open(aspect_float, 'w', **float32_profile(area_raster)) as float_raster, \
+            (rasterio.open(aspect_output, 'w', **int16_profile(area_raster)) if aspect_output != None
+             else contextlib.nullcontext()) as integer_raster:
+        # Define function to read elevation with a 1 cell halo
+        def read_block(tile):
+            read_window, write_window = tile
+            return (area_raster.read_masks(1, window=write_window),
+                    read_aligned(elevation_raster, area_raster, read_window),
+                    grid_convergence(area_raster, write_window))
+
+        # Calculate each block while the next block is read and the previous block is written
+        cell_width = abs(area_raster.transform.a)
+        cell_height = abs(area_raster.transform.e)
+        with write_behind(float_raster, 512, np.float32) as (float_output, submit_float), \
+                write_behind(integer_raster, 512, np.int16) as (integer_output, submit_integer):
+            for (read_window, write_window), (area_mask, elevation_block, convergence) in prefetch_blocks(
+                    read_block, tile_grid(area_raster.height, area_raster.width, size=512, overlap=1)):
+                float_block = float_output(write_window)
+                integer_block = integer_output(write_window)
+                aspect_kernel(elevation_block, area_mask, cell_width, cell_height, convergence,
+                              float_block, integer_block)
+                submit_float(float_block, write_window)
+                submit_integer(integer_block, write_window)
@@ -2,11 +2,22 @@
 # ---------------------------------------------------------------------------
 # Calculate exposure
 # Author: Timm Nawrocki
-# Last Updated: 2023-10-19
-# Usage: Execute in ArcGIS Pro Python 3.9+.
+# Last Updated: 2026-10-14
+# Usage: Requires numpy, numba, and rasterio.
 # Description: "Calculate exposure" is a function that calculates a continuous index of solar exposure weighted by steepness of the slope. This function is adapted from Geomorphometry and Gradient Metrics Toolbox 2.0 by Jeff Evans and Jim Oakleaf (2014) available at https://github.com/jeffreyevans/GradientMetrics.
 # ---------------------------------------------------------------------------
 
+# Import packages
+import numpy as np
+import rasterio
+from akgeomorph._kernels import exposure_kernel
+from akgeomorph._rast import int16_profile
+from akgeomorph._rast import prefetch_blocks
+from akgeomorph._rast import read_aligned
+from akgeomorph._rast import tile_grid
+from akgeomorph._rast import write_behind
+
+
 # Define function to calculate solar exposure index
 def calculate_exposure(area_input, aspect_input, slope_input, conversion_factor, exposure_output):
     """
@@ -20,68 +31,23 @@ def calculate_exposure(area_input, aspect_input, slope_input, conversion_factor,
     Preconditions: requires an input aspect and slope raster
     """
 
-    # Import packages
-    from numpy import pi
-    import arcpy
-    from arcpy.sa import Cos
-    from arcpy.sa import ExtractByMask
-    from arcpy.sa import Int
-    from arcpy.sa import Raster
-
-    # Set overwrite option
-    arcpy.env.overwriteOutput = True
-
-    # Specify core usage
-    arcpy.env.parallelProcessingFactor = "75%"
-
-    # Set snap raster and extent
-    area_raster = Raster(area_input)
-    arcpy.env.snapRaster = area_raster
-    arcpy.env.extent = area_raster.extent
-
-    # Set cell size environment
-    cell_size = arcpy.management.GetRasterProperties(area_raster, 'CELLSIZEX', '').getOutput(0)
-    arcpy.env.cellSize = int(cell_size)
-
-    # Convert degrees to radians
-    print('\tConverting degrees to radians...')
-    aspect_radian = Raster(aspect_input) * (pi/180)
-
-    # Calculate cosine of modified aspect
-    print('\tCalculating cosine of aspect...')
-    cos_aspect = Cos(aspect_radian - pi)
-
     # Calculate solar exposure index
-    print('\tMultiplying cosine by slope...')
-    exposure_raster = cos_aspect * Raster(slope_input)
-
-    # Convert to integer
-    print('\tConverting to integer...')
-    integer_raster = Int((exposure_raster * conversion_factor) + 0.5)
-
-    # Extract to area raster
-    print('\tExtracting raster to area...')
-    extract_integer = ExtractByMask(integer_raster, area_raster)
-
-    # Export raster
-    print('\tExporting exposure raster as 16-bit signed...')
-    arcpy.management.CopyRaster(extract_integer,
-                                exposure_output,
-                                '',
-                                '32767',
-                                '-32768',
-                                'NONE',
-                                'NONE',
-                                '16_BIT_SIGNED',
-                                'NONE',
-                                'NONE',
-                                'TIFF',
-                                'NONE')
-    arcpy.management.BuildPyramids(exposure_output,
-                                   '-1',
-                                   'NONE',
-                                   'BILINEAR',
-                                   'LZ77',
-                                   '',
-                                   'OVERWRITE')
-    arcpy.management.CalculateStatistics(exposure_output)
+    print('\tCalculating solar exposure index...')
+    with rasterio.open(area_input) as area_raster, \
+            rasterio.open(aspect_input) as aspect_raster, \
+            rasterio.open(slope_input) as slope_raster, \
+            rasterio.open(exposure_output, 'w', **int16_profile(area_raster)) as exposure_raster:
+        # Define function to read aligned input blocks
+        def read_block(tile):
+            read_window, write_window = tile
+            return (area_raster.read_masks(1, window=write_window),
+                    read_aligned(aspect_raster, area_raster, write_window),
+                    read_aligned(slope_raster, area_raster, write_window))
+
+        # Calculate each block while the next block is read and the previous block is written
+        with write_behind(exposure_raster, 512, np.int16) as (output_block, submit_block):
+            for (read_window, write_window), (area_mask, aspect_block, slope_block) in prefetch_blocks(
+                    read_block, tile_grid(area_raster.height, area_raster.width, size=512)):
+                exposure_block = output_block(write_window)
+                exposure_kernel(aspect_block, slope_block, area_mask, float(conversion_factor), exposure_block)
+                submit_block(exposure_block, write_window)
@@ -2,11 +2,23 @@
 # ---------------------------------------------------------------------------
 # Calculate flow accumulation
 # Author: Timm Nawrocki
-# Last Updated: 2024-05-04
+# Last Updated: 2026-10-14
 # Usage: Execute in ArcGIS Pro Python 3.9+.
 # Description: "Calculate flow accumulation" is a function that calculates flow accumulation from a float elevation raster.
 # ---------------------------------------------------------------------------
 
+# Import packages
+from akgeomorph._env import raster_env
+from akgeomorph._post import finalize_raster
+
+# Import arcpy packages if available
+try:
+    import arcpy
+    from arcpy.sa import DeriveContinuousFlow
+except ImportError:
+    arcpy = None
+
+
 # Define function to calculate flow accumulation
 def calculate_flow(elevation_input, accumulation_output, direction_output):
     """
@@ -18,56 +30,18 @@ def calculate_flow(elevation_input, accumulation_output, direction_output):
     Preconditions: requires float input elevation raster
     """
 
-    # Import packages
-    import arcpy
-    from arcpy.sa import DeriveContinuousFlow
-    from arcpy.sa import Raster
-
-    # Set overwrite option
-    arcpy.env.overwriteOutput = True
-
-    # Specify core usage
-    arcpy.env.parallelProcessingFactor = "75%"
-
-    # Set snap raster and extent
-    area_raster = Raster(elevation_input)
-    arcpy.env.snapRaster = area_raster
-    arcpy.env.extent = area_raster.extent
-
-    # Set cell size environment
-    cell_size = arcpy.management.GetRasterProperties(area_raster, 'CELLSIZEX', '').getOutput(0)
-    arcpy.env.cellSize = int(cell_size)
-
-    # Calculate flow accumulation
-    print('\tCalculating flow accumulation...')
-    accumulation_raster = DeriveContinuousFlow(elevation_input,
-                                               '',
-                                               '',
-                                               direction_output,
-                                               'MFD',
-                                               'NORMAL')
-
-    # Export raster
-    print('\tExporting flow accumulation raster as 32-bit float...')
-    arcpy.management.CopyRaster(accumulation_raster,
-                                accumulation_output,
-                                '',
-                                '',
-                                '-2147483648',
-                                'NONE',
-                                'NONE',
-                                '32_BIT_FLOAT',
-                                'NONE',
-                                'NONE',
-                                'TIFF',
-                                'NONE',
-                                'CURRENT_SLICE',
-                                'NO_TRANSPOSE')
-    arcpy.management.BuildPyramids(accumulation_output,
-                                   '-1',
-                                   'NONE',
-                                   'BILINEAR',
-                                   'LZ77',
-                                   '',
-                                   'OVERWRITE')
-    arcpy.management.CalculateStatistics(accumulation_output)
+    # Set arcpy environment to the study area
+    with raster_env(elevation_input):
+        # Calculate flow accumulation
+        print('\tCalculating flow accumulation...')
+        accumulation_raster = DeriveContinuousFlow(elevation_input,
+                                                   '',
+                                                   '',
+                                                   direction_output,
+                                                   'MFD',
+                                                   'NORMAL')
+
+        # Export raster
+        print('\tExporting flow accumulation raster as 32-bit float...')
+        accumulation_raster.save(accumulation_output)
+        finalize_raster(accumulation_output)
@@ -2,11 +2,23 @@
 # ---------------------------------------------------------------------------
 # Calculate distance to flowline
 # Author: Timm Nawrocki
-# Last Updated: 2024-05-06
-# Usage: Execute in ArcGIS Pro Python 3.9+.
-# Description: "Calculate distance to flowline" is a function that calculates the distance accumulation to the nearest flowline raster cell.
+# Last Updated: 2026-10-14
+# Usage: Requires numpy, numba, and rasterio.
+# Description: "Calculate distance to flowline" is a function that calculates the euclidean distance to the nearest flowline raster cell.
 # ---------------------------------------------------------------------------
 
+# Import packages
+import os
+import numpy as np
+import rasterio
+from akgeomorph._kernels import euclidean_distance_kernel
+from akgeomorph._rast import bit_profile
+from akgeomorph._rast import build_overviews
+from akgeomorph._rast import int16_profile
+from akgeomorph._rast import update_statistics
+from akgeomorph._rast import write_statistics
+
+
 # Define function to calculate distance to flowline
 def calculate_flowline_distance(accumulation_input, threshold, flowline_output, distance_output):
     """
@@ -16,126 +28,70 @@ def calculate_flowline_distance(accumulation_input, threshold, flowline_output,
             'flowline_output' -- a file path for an output 1-bit integer flowline raster
             'distance_output' -- a file path for an output 16-bit integer distance to flowline raster
     Returned Value: Returns a raster dataset on disk
-    Preconditions: requires input flow accumulation raster
+    Preconditions: requires input flow accumulation raster, and an existing flowline output must share its grid
     """
 
-    # Import packages
-    import os
-    import arcpy
-    from arcpy.sa import Con
-    from arcpy.sa import DistanceAccumulation
-    from arcpy.sa import ExtractByMask
-    from arcpy.sa import Int
-    from arcpy.sa import IsNull
-    from arcpy.sa import Raster
-    from arcpy.sa import SetNull
-
-    # Set overwrite option
-    arcpy.env.overwriteOutput = True
-
-    # Specify core usage
-    arcpy.env.parallelProcessingFactor = "75%"
-
-    # Set snap raster and extent
-    area_raster = Raster(accumulation_input)
-    arcpy.env.snapRaster = area_raster
-    arcpy.env.extent = area_raster.extent
+    # Determine if any flow accumulation values reach the threshold
+    print('\tChecking flow accumulation against threshold...')
+    flowline_status = False
+    with rasterio.open(accumulation_input) as accumulation_raster:
+        for ij, window in accumulation_raster.block_windows(1):
+            accumulation_block = accumulation_raster.read(1, window=window, masked=True)
+            if accumulation_block.count() > 0 and accumulation_block.max() >= threshold:
+                flowline_status = True
+                break
 
-    # Set cell size environment
-    cell_size = arcpy.management.GetRasterProperties(area_raster, 'CELLSIZEX', '').getOutput(0)
-    arcpy.env.cellSize = int(cell_size)
+    # Calculate distance to flowline if any cells meet the threshold
+    if flowline_status:
+        # Calculate flowlines
+        if os.path.exists(flowline_output) == 0:
+            print('\tCalculating flowlines as 1-bit raster...')
+            with rasterio.open(accumulation_input) as accumulation_raster, \
+                    rasterio.open(flowline_output, 'w', **bit_profile(accumulation_raster)) as flowline_raster:
+                statistics = None
+                for ij, window in flowline_raster.block_windows(1):
+                    accumulation_block = accumulation_raster.read(1, window=window, masked=True)
+                    flowline_block = (accumulation_block >= threshold).filled(False).astype('uint8')
+                    flowline_raster.write(flowline_block, 1, window=window)
+                    statistics = update_statistics(statistics, flowline_block, flowline_raster.nodata)
+                write_statistics(flowline_raster, statistics)
+                build_overviews(flowline_raster)
 
-    # Calculate flowlines
-    if os.path.exists(flowline_output) == 0:
-        print('\tCalculating flowlines...')
-        flowline_raster = SetNull(Raster(accumulation_input) < threshold, 1)
-        # Export flowlines
-        print('\tExporting flowlines raster as 1-bit...')
-        arcpy.management.CopyRaster(flowline_raster,
-                                    flowline_output,
-                                    '',
-                                    '',
-                                    '0',
-                                    'NONE',
-                                    'NONE',
-                                    '1_BIT',
-                                    'NONE',
-                                    'NONE',
-                                    'TIFF',
-                                    'NONE')
-        arcpy.management.BuildPyramids(flowline_output,
-                                       '-1',
-                                       'NONE',
-                                       'BILINEAR',
-                                       'LZ77',
-                                       '',
-                                       'OVERWRITE')
-        arcpy.management.CalculateStatistics(flowline_output)
-
-    # Determine if flowline raster is all nodata
-    raster_status = arcpy.management.GetRasterProperties(flowline_output, 'ALLNODATA')
-
-    # Calculate distance to flowline if the flowline raster contains valid data
-    if int(raster_status[0]) == 0:
+        # Calculate distance to flowline
         print('\tCalculating distance to flowline...')
-        flowline_distance = DistanceAccumulation(flowline_output)
-
-        # Convert to integer
-        print('\tConverting to integer...')
-        integer_raster = Int((flowline_distance) + 0.5)
-        corrected_raster = Con(integer_raster > 32767, 32767, integer_raster)
+        with rasterio.open(accumulation_input) as accumulation_raster, \
+                rasterio.open(flowline_output) as flowline_raster:
+            # Read flowlines as 8-bit values on the flow accumulation grid
+            if (flowline_raster.crs != accumulation_raster.crs
+                    or flowline_raster.transform != accumulation_raster.transform
+                    or flowline_raster.shape != accumulation_raster.shape):
+                raise ValueError(f'{flowline_output} does not share the grid of {accumulation_input}')
+            flowline_cells = flowline_raster.read(1, out_dtype='uint8') == 1
+            distance_cells = euclidean_distance_kernel(flowline_cells, accumulation_raster.transform.a)
+            del flowline_cells
 
-        # Extract to area raster
-        print('\tExtracting raster to area...')
-        extract_integer = ExtractByMask(corrected_raster, area_raster)
+            # Extract to area raster
+            print('\tExporting stream distance raster as 16-bit signed...')
+            with rasterio.open(distance_output, 'w', **int16_profile(accumulation_raster)) as output_raster:
+                statistics = None
+                for ij, window in output_raster.block_windows(1):
+                    area_mask = accumulation_raster.read_masks(1, window=window)
+                    distance_block = np.where(area_mask == 0, -32768, distance_cells[window.toslices()]).astype('int16')
+                    output_raster.write(distance_block, 1, window=window)
+                    statistics = update_statistics(statistics, distance_block, output_raster.nodata)
+                write_statistics(output_raster, statistics)
+                build_overviews(output_raster)
 
-        # Export raster
-        print('\tExporting stream distance raster as 16-bit signed...')
-        arcpy.management.CopyRaster(extract_integer,
-                                    distance_output,
-                                    '',
-                                    '',
-                                    '-32768',
-                                    'NONE',
-                                    'NONE',
-                                    '16_BIT_SIGNED',
-                                    'NONE',
-                                    'NONE',
-                                    'TIFF',
-                                    'NONE')
-        arcpy.management.BuildPyramids(distance_output,
-                                       '-1',
-                                       'NONE',
-                                       'BILINEAR',
-                                       'LZ77',
-                                       '',
-                                       'OVERWRITE')
-        arcpy.management.CalculateStatistics(distance_output)
-
-    # Calculate flowline distance as maximum possible if flowline raster is all nodata
+    # Calculate flowline distance as maximum possible if no cells meet the threshold
     else:
         print('\tInferring maximum distance to flowline...')
-        flowline_distance = Con(IsNull(Raster(accumulation_input)), Raster(accumulation_input), 32767)
-
-        # Export raster
-        print('\tExporting stream distance raster as 16-bit signed...')
-        arcpy.management.CopyRaster(flowline_distance,
-                                    distance_output,
-                                    '',
-                                    '',
-                                    '-32768',
-                                    'NONE',
-                                    'NONE',
-                                    '16_BIT_SIGNED',
-                                    'NONE',
-                                    'NONE',
-                                    'TIFF',
-                                    'NONE')
-        arcpy.management.BuildPyramids(distance_output,
-                                       '-1',
-                                       'NONE',
-                                       'BILINEAR',
-                                       'LZ77',
-                                       '',
-                                       'OVERWRITE')
-        arcpy.management.CalculateStatistics(distance_output)
+        with rasterio.open(accumulation_input) as accumulation_raster, \
+                rasterio.open(distance_output, 'w', **int16_profile(accumulation_raster)) as output_raster:
+            statistics = None
+            for ij, window in output_raster.block_windows(1):
+                area_mask = accumulation_raster.read_masks(1, window=window)
+                distance_block = np.where(area_mask == 0, -32768, 32767).astype('int16')
+                output_raster.write(distance_block, 1, window=window)
+                statistics = update_statistics(statistics, distance_block, output_raster.nodata)
+            write_statistics(output_raster, statistics)
+            build_overviews(output_raster)
@@ -2,11 +2,30 @@
 # ---------------------------------------------------------------------------
 # Calculate heat load index
 # Author: Timm Nawrocki
-# Last Updated: 2024-05-04
+# Last Updated: 2026-10-14
 # Usage: Execute in ArcGIS Pro Python 3.9+.
 # Description: "Calculate heat load index" is a function that calculates an index of solar heat. This function is adapted from Geomorphometry and Gradient Metrics Toolbox 2.0 by Jeff Evans and Jim Oakleaf (2014) available at https://github.com/jeffreyevans/GradientMetrics.
 # ---------------------------------------------------------------------------
 
+# Import packages
+import math
+from akgeomorph._env import raster_env
+from akgeomorph._env import scratch_raster
+from akgeomorph._kernels import DEG2RAD
+from akgeomorph._rast import to_int16_tiled
+
+# Import arcpy packages if available
+try:
+    import arcpy
+    from arcpy.sa import Abs
+    from arcpy.sa import Cos
+    from arcpy.sa import Exp
+    from arcpy.sa import Raster
+    from arcpy.sa import Sin
+except ImportError:
+    arcpy = None
+
+
 # Define function to calculate heat load index
 def calculate_heat_load(area_input, elevation_input, slope_input, aspect_input, conversion_factor, heatload_output):
     """
@@ -21,100 +40,49 @@ def calculate_heat_load(area_input, elevation_input, slope_input, aspect_input,
     Preconditions: requires input elevation, slope, and aspects rasters
     """
 
-    # Import packages
-    import math
-    from numpy import pi
-    import arcpy
-    from arcpy.sa import Abs
-    from arcpy.sa import Cos
-    from arcpy.sa import Exp
-    from arcpy.sa import ExtractByMask
-    from arcpy.sa import Int
-    from arcpy.sa import Raster
-    from arcpy.sa import Sin
-    import math
-
-    # Set overwrite option
-    arcpy.env.overwriteOutput = True
-
-    # Specify core usage
-    arcpy.env.parallelProcessingFactor = "75%"
-
-    # Set snap raster and extent
-    area_raster = Raster(area_input)
-    arcpy.env.snapRaster = area_raster
-    arcpy.env.extent = area_raster.extent
-
-    # Set cell size environment
-    cell_size = arcpy.management.GetRasterProperties(area_raster, 'CELLSIZEX', '').getOutput(0)
-    arcpy.env.cellSize = int(cell_size)
-
-    # Calculate middle latitude of extent in WGS84 projection
-    print('\t\tCalculating raster properties...')
-    # Identify extent of elevation input
-    grid_extent = Raster(elevation_input).extent
-    # Project extent to WGS84
-    project_extent = grid_extent.projectAs(arcpy.SpatialReference(4326))
-    # Check upper and lower bounds
-    lower_lat = float(project_extent.YMin)
-    upper_lat = float(project_extent.YMax)
-    # Calculate middle latitude
-    middle_latitude = abs(((lower_lat + upper_lat) / 2) + lower_lat)
-    # Convert middle latitude to radians
-    middle_radian = middle_latitude * (pi/180)
-    cos_latitude = math.cos(middle_radian)
-    sin_latitude = math.sin(middle_radian)
-
-    # Convert degrees to radians
-    print('\tConverting degrees to radians...')
-    slope_radian = Raster(slope_input) * (pi/180)
-    aspect_radian = Raster(aspect_input) * (pi/180)
-
-    # Calculate heat load index
-    print('\tCalculating heat load index...')
-    # Calculate modified aspect
-    modified_aspect = Abs(pi - Abs(aspect_radian - 3.926991))
-    # Calculate sine and cosine of slope
-    cos_slope = Cos(slope_radian)
-    sin_slope = Sin(slope_radian)
-    # Calculate sine and cosine of modified aspect
-    cos_aspect = Cos(modified_aspect)
-    sin_aspect = Sin(modified_aspect)
-    # Calculate intermediate values
-    factor_1 = 1.582 * cos_latitude * cos_slope
-    factor_2 = 1.5 * cos_aspect * sin_slope * sin_latitude
-    factor_3 = 0.262 * sin_latitude * sin_slope
-    factor_4 = 0.607 * sin_aspect * sin_slope
-    # Calculate heat load index
-    heat_load = Exp(-1.467 + factor_1 - factor_2 - factor_3 + factor_4)
+    # Set arcpy environment to the study area
+    with raster_env(area_input) as (area_raster, cell_size):
+        # Calculate middle latitude of extent in WGS84 projection
+        print('\t\tCalculating raster properties...')
+        # Identify extent of elevation input
+        grid_extent = Raster(elevation_input).extent
+        # Project extent to WGS84
+        project_extent = grid_extent.projectAs(arcpy.SpatialReference(4326))
+        # Check upper and lower bounds
+        lower_lat = float(project_extent.YMin)
+        upper_lat = float(project_extent.YMax)
+        # Calculate middle latitude
+        middle_latitude = abs(((lower_lat + upper_lat) / 2) + lower_lat)
+        # Convert middle latitude to radians
+        middle_radian = middle_latitude * DEG2RAD
+        cos_latitude = math.cos(middle_radian)
+        sin_latitude = math.sin(middle_radian)
 
-    # Convert to integer
-    print('\tConverting to integer...')
-    integer_raster = Int((heat_load * conversion_factor) + 0.5)
+        # Convert degrees to radians
+        print('\tConverting degrees to radians...')
+        slope_radian = Raster(slope_input) * DEG2RAD
+        aspect_radian = Raster(aspect_input) * DEG2RAD
 
-    # Extract to area raster
-    print('\tExtracting raster to area...')
-    extract_integer = ExtractByMask(integer_raster, area_raster)
+        # Calculate heat load index
+        print('\tCalculating heat load index...')
+        # Calculate modified aspect
+        modified_aspect = Abs(math.pi - Abs(aspect_radian - 3.926991))
+        # Calculate sine and cosine of slope
+        cos_slope = Cos(slope_radian)
+        sin_slope = Sin(slope_radian)
+        # Calculate sine and cosine of modified aspect
+        cos_aspect = Cos(modified_aspect)
+        sin_aspect = Sin(modified_aspect)
+        # Calculate intermediate values
+        factor_1 = 1.582 * cos_latitude * cos_slope
+        factor_2 = 1.5 * cos_aspect * sin_slope * sin_latitude
+        factor_3 = 0.262 * sin_latitude * sin_slope
+        factor_4 = 0.607 * sin_aspect * sin_slope
+        # Calculate heat load index
+        heat_load = Exp(-1.467 + factor_1 - factor_2 - factor_3 + factor_4)
 
-    # Export raster
-    print('\tExporting heat load raster as 16-bit signed...')
-    arcpy.management.CopyRaster(extract_integer,
-                                heatload_output,
-                                '',
-                                '32767',
-                                '-32768',
-                                'NONE',
-                                'NONE',
-                                '16_BIT_SIGNED',
-                                'NONE',
-                                'NONE',
-                                'TIFF',
-                                'NONE')
-    arcpy.management.BuildPyramids(heatload_output,
-                                   '-1',
-                                   'NONE',
-                                   'BILINEAR',
-                                   'LZ77',
-                                   '',
-                                   'OVERWRITE')
-    arcpy.management.CalculateStatistics(heatload_output)
+        # Convert to integer, extract to area raster, and export
+        print('\tExporting heat load raster as 16-bit signed...')
+        with scratch_raster('heat_load.tif') as heat_load_path:
+            heat_load.save(heat_load_path)
+            to_int16_tiled(heat_load_path, heatload_output, area_input, conversion_factor)
@@ -2,11 +2,15 @@
 # ---------------------------------------------------------------------------
 # Calculate integer elevation
 # Author: Timm Nawrocki
-# Last Updated: 2024-05-04
-# Usage: Execute in ArcGIS Pro Python 3.9+.
+# Last Updated: 2026-10-14
+# Usage: Requires numpy, numba, and rasterio.
 # Description: "Calculate integer elevation" is a function that calculates integer elevation from float elevation.
 # ---------------------------------------------------------------------------
 
+# Import packages
+from akgeomorph._rast import to_int16_tiled
+
+
 # Define function to calculate integer elevation
 def calculate_integer_elevation(area_input, elevation_input, elevation_output):
     """
@@ -18,54 +22,6 @@ def calculate_integer_elevation(area_input, elevation_input, elevation_output):
     Preconditions: requires float input elevation raster
     """
 
-    # Import packages
-    import arcpy
-    from arcpy.sa import ExtractByMask
-    from arcpy.sa import Int
-    from arcpy.sa import Raster
-
-    # Set overwrite option
-    arcpy.env.overwriteOutput = True
-
-    # Specify core usage
-    arcpy.env.parallelProcessingFactor = "75%"
-
-    # Set snap raster and extent
-    area_raster = Raster(area_input)
-    arcpy.env.snapRaster = area_raster
-    arcpy.env.extent = area_raster.extent
-
-    # Set cell size environment
-    cell_size = arcpy.management.GetRasterProperties(area_raster, 'CELLSIZEX', '').getOutput(0)
-    arcpy.env.cellSize = int(cell_size)
-
-    # Round to integer
-    print(f'\t\tConverting values to integers...')
-    integer_raster = Int(Raster(elevation_input) + 0.5)
-
-    # Extract to area raster
-    print('\t\tExtracting raster to area...')
-    extract_integer = ExtractByMask(integer_raster, area_raster)
-
-    # Copy extracted raster to output
-    print(f'\t\tExporting integer elevation as 16-bit signed raster...')
-    arcpy.management.CopyRaster(extract_integer,
-                                elevation_output,
-                                '',
-                                '32767',
-                                '-32768',
-                                'NONE',
-                                'NONE',
-                                '16_BIT_SIGNED',
-                                'NONE',
-                                'NONE',
-                                'TIFF',
-                                'NONE')
-    arcpy.management.BuildPyramids(elevation_output,
-                                   '-1',
-                                   'NONE',
-                                   'BILINEAR',
-                                   'LZ77',
-                                   '',
-                                   'OVERWRITE')
-    arcpy.management.CalculateStatistics(elevation_output)
+    # Round to integer, extract to area raster, and build pyramids and statistics
+    print(f'\t\tConverting values to integers and extracting to area...')
+    to_int16_tiled(elevation_input, elevation_output, area_input)
@@ -2,11 +2,23 @@
 # ---------------------------------------------------------------------------
 # Calculate topographic position
 # Author: Timm Nawrocki
-# Last Updated: 2024-05-04
-# Usage: Execute in ArcGIS Pro Python 3.9+.
+# Last Updated: 2026-10-14
+# Usage: Requires numpy, numba, and rasterio.
 # Description: "Calculate topographic position" is a function that calculates a continuous index of topographic position using a user-defined window, ideally of multiple kilometers. This function is adapted from Geomorphometry and Gradient Metrics Toolbox 2.0 by Jeff Evans and Jim Oakleaf (2014) available at https://github.com/jeffreyevans/GradientMetrics.
 # ---------------------------------------------------------------------------
 
+# Import packages
+import numpy as np
+import rasterio
+from akgeomorph._kernels import position_kernel
+from akgeomorph._rast import describe_area
+from akgeomorph._rast import int16_profile
+from akgeomorph._rast import prefetch_blocks
+from akgeomorph._rast import read_aligned
+from akgeomorph._rast import tile_grid
+from akgeomorph._rast import write_behind
+
+
 # Define function to calculate topographic position
 def calculate_position(area_input, elevation_input, position_width, position_output):
     """
@@ -16,73 +28,33 @@ def calculate_position(area_input, elevation_input, position_width, position_out
             'position_width' -- a length in meters to define the axis length for a neighborhood square
             'position_output' -- a file path for an output 16-bit integer topographic position raster
     Returned Value: Returns a raster dataset on disk
-    Preconditions: requires an input elevation raster
+    Preconditions: requires an input elevation raster that shares cell size and snap with the study area
     """
 
-    # Import packages
-    import arcpy
-    from arcpy.sa import ExtractByMask
-    from arcpy.sa import FocalStatistics
-    from arcpy.sa import Int
-    from arcpy.sa import NbrRectangle
-    from arcpy.sa import Raster
-
-    # Set overwrite option
-    arcpy.env.overwriteOutput = True
-
-    # Specify core usage
-    arcpy.env.parallelProcessingFactor = "75%"
-
-    # Set snap raster and extent
-    area_raster = Raster(area_input)
-    arcpy.env.snapRaster = area_raster
-    arcpy.env.extent = area_raster.extent
-
-    # Set cell size environment
-    cell_size = arcpy.management.GetRasterProperties(area_raster, 'CELLSIZEX', '').getOutput(0)
-    arcpy.env.cellSize = int(cell_size)
-
-    # Determine neighborhood size
+    # Determine neighborhood size, placing the processing cell above and left of center for even sizes
+    cell_size, bounds = describe_area(area_input)
     axis_length = int(position_width / float(cell_size))
+    before = (axis_length - 1) // 2
+    after = axis_length // 2
 
-    # Define a neighborhood variable
-    neighborhood = NbrRectangle(axis_length, axis_length, 'CELL')
-
-    # Calculate focal mean
-    print('\tCalculating focal mean...')
-    focal_mean = FocalStatistics(elevation_input, neighborhood, 'MEAN', 'DATA')
+    # Size tiles so that the neighborhood halo is a small fraction of each read
+    tile_size = 512 * max(1, -(-4 * after // 512))
 
-    # Calculate topographic position
+    # Calculate topographic position from the focal mean of each block
     print('\tCalculating topographic position...')
-    position_raster = Raster(elevation_input) - focal_mean
-
-    # Convert to integer
-    print('\tConverting to integer...')
-    integer_raster = Int(position_raster + 0.5)
-
-    # Extract to area raster
-    print('\tExtracting raster to area...')
-    extract_integer = ExtractByMask(integer_raster, area_raster)
-
-    # Export raster
-    print('\tExporting position raster as 16-bit signed...')
-    arcpy.management.CopyRaster(extract_integer,
-                                position_output,
-                                '',
-                                '32767',
-                                '-32768',
-                                'NONE',
-                                'NONE',
-                                '16_BIT_SIGNED',
-                                'NONE',
-                                'NONE',
-                                'TIFF',
-                                'NONE')
-    arcpy.management.BuildPyramids(position_output,
-                                   '-1',
-                                   'NONE',
-                                   'BILINEAR',
-                                   'LZ77',
-                                   '',
-                                   'OVERWRITE')
-    arcpy.management.CalculateStatistics(position_output)
+    with rasterio.open(area_input) as area_raster, \
+            rasterio.open(elevation_input) as elevation_raster, \
+            rasterio.open(position_output, 'w', **int16_profile(area_raster)) as position_raster:
+        # Define function to read elevation with a neighborhood halo
+        def read_block(tile):
+            read_window, write_window = tile
+            return (area_raster.read_masks(1, window=write_window),
+                    read_aligned(elevation_raster, area_raster, read_window))
+
+        # Calculate each block while the next block is read and the previous block is written
+        with write_behind(position_raster, tile_size, np.int16) as (output_block, submit_block):
+            for (read_window, write_window), (area_mask, elevation_block) in prefetch_blocks(
+                    read_block, tile_grid(area_raster.height, area_raster.width, size=tile_size, overlap=after)):
+                position_block = output_block(write_window)
+                position_kernel(elevation_block, area_mask, before, after, position_block)
+                submit_block(position_block, write_window)
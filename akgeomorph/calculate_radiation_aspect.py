@@ -2,11 +2,27 @@
 # ---------------------------------------------------------------------------
 # Calculate topographic radiation aspect index
 # Author: Timm Nawrocki
-# Last Updated: 2024-05-04
+# Last Updated: 2026-10-14
 # Usage: Execute in ArcGIS Pro Python 3.9+.
 # Description: "Calculate topographic radiation aspect index" is a function that calculates a continuous index of aspect from the coolest and wettest NNE aspects to the hottest and dryest SSW aspects. This function is adapted from Geomorphometry and Gradient Metrics Toolbox 2.0 by Jeff Evans and Jim Oakleaf (2014) available at https://github.com/jeffreyevans/GradientMetrics.
 # ---------------------------------------------------------------------------
 
+# Import packages
+from akgeomorph._env import raster_env
+from akgeomorph._env import scratch_raster
+from akgeomorph._kernels import DEG2RAD
+from akgeomorph._rast import to_int16_tiled
+
+# Import arcpy packages if available
+try:
+    import arcpy
+    from arcpy.sa import Con
+    from arcpy.sa import Cos
+    from arcpy.sa import Raster
+except ImportError:
+    arcpy = None
+
+
 # Define function to calculate topographic radiation
 def calculate_radiation_aspect(area_input, aspect_input, conversion_factor, radiation_output):
     """
@@ -19,69 +35,25 @@ def calculate_radiation_aspect(area_input, aspect_input, conversion_factor, radi
     Preconditions: requires an input raw aspect raster
     """
 
-    # Import packages
-    from numpy import pi
-    import arcpy
-    from arcpy.sa import Con
-    from arcpy.sa import Cos
-    from arcpy.sa import ExtractByMask
-    from arcpy.sa import Int
-    from arcpy.sa import Raster
-
-    # Set overwrite option
-    arcpy.env.overwriteOutput = True
-
-    # Specify core usage
-    arcpy.env.parallelProcessingFactor = "75%"
-
-    # Set snap raster and extent
-    area_raster = Raster(area_input)
-    arcpy.env.snapRaster = area_raster
-    arcpy.env.extent = area_raster.extent
-
-    # Set cell size environment
-    cell_size = arcpy.management.GetRasterProperties(area_raster, 'CELLSIZEX', '').getOutput(0)
-    arcpy.env.cellSize = int(cell_size)
-
-    # Convert degrees to radians
-    print('\tConverting degrees to radians...')
-    aspect_radian = Raster(aspect_input) * (pi/180)
-
-    # Calculate topographic radiation
-    print('\tCalculating topographic radiation aspect index...')
-    radiation_raster = (1 - Cos(aspect_radian - (30 * (pi/180)))) / 2
+    # Set arcpy environment to the study area
+    with raster_env(area_input) as (area_raster, cell_size):
+        # Open aspect raster once
+        aspect_raster = Raster(aspect_input)
 
-    # Convert negative aspect values
-    print('\tConverting negative aspect values...')
-    conditional_raster = Con(Raster(aspect_radian) < 0, 0.5, radiation_raster)
+        # Convert degrees to radians
+        print('\tConverting degrees to radians...')
+        aspect_radian = aspect_raster * DEG2RAD
 
-    # Convert to integer
-    print('\tConverting to integer...')
-    integer_raster = Int((conditional_raster * conversion_factor) + 0.5)
+        # Calculate topographic radiation
+        print('\tCalculating topographic radiation aspect index...')
+        radiation_raster = (1 - Cos(aspect_radian - (30 * DEG2RAD))) / 2
 
-    # Extract to area raster
-    print('\tExtracting raster to area...')
-    extract_integer = ExtractByMask(integer_raster, area_raster)
+        # Convert negative aspect values
+        print('\tConverting negative aspect values...')
+        conditional_raster = Con(aspect_raster < 0, 0.5, radiation_raster)
 
-    # Export raster
-    print('\tExporting radiation raster as 16-bit signed...')
-    arcpy.management.CopyRaster(extract_integer,
-                                radiation_output,
-                                '',
-                                '32767',
-                                '-32768',
-                                'NONE',
-                                'NONE',
-                                '16_BIT_SIGNED',
-                                'NONE',
-                                'NONE',
-                                'TIFF',
-                                'NONE')
-    arcpy.management.BuildPyramids(radiation_output,
-                                   '-1',
-                                   'NONE',
-                                   'BILINEAR',
-                                   'LZ77',
-                                   '',
-                                   'OVERWRITE')
-    arcpy.management.CalculateStatistics(radiation_output)
+        # Convert to integer, extract to area raster, and export
+        print('\tExporting radiation raster as 16-bit signed...')
+        with scratch_raster('conditional_raster.tif') as conditional_raster_path:
+            conditional_raster.save(conditional_raster_path)
+            to_int16_tiled(conditional_raster_path, radiation_output, area_input, conversion_factor)
@@ -2,11 +2,22 @@
 # ---------------------------------------------------------------------------
 # Calculate roughness
 # Author: Timm Nawrocki
-# Last Updated: 2024-05-04
-# Usage: Execute in ArcGIS Pro Python 3.9+.
+# Last Updated: 2026-10-14
+# Usage: Requires numpy, numba, and rasterio.
 # Description: "Calculate roughness" is a function that calculates roughness as the square of focal standard deviation using a 5x5 cell window. This function is adapted from Geomorphometry and Gradient Metrics Toolbox 2.0 by Jeff Evans and Jim Oakleaf (2014) available at https://github.com/jeffreyevans/GradientMetrics.
 # ---------------------------------------------------------------------------
 
+# Import packages
+import numpy as np
+import rasterio
+from akgeomorph._kernels import roughness_kernel
+from akgeomorph._rast import int16_profile
+from akgeomorph._rast import prefetch_blocks
+from akgeomorph._rast import read_aligned
+from akgeomorph._rast import tile_grid
+from akgeomorph._rast import write_behind
+
+
 # Define function to calculate roughness
 def calculate_roughness(area_input, elevation_input, conversion_factor, roughness_output):
     """
@@ -16,75 +27,24 @@ def calculate_roughness(area_input, elevation_input, conversion_factor, roughnes
             'conversion_factor' -- an integer to be multiplied with the output for conversion to integer raster
             'roughness_output' -- a file path for an output 16-bit integer roughness raster
     Returned Value: Returns a raster dataset on disk
-    Preconditions: requires an input elevation raster
+    Preconditions: requires an input elevation raster that shares cell size and snap with the study area
     """
 
-    # Import packages
-    import arcpy
-    from arcpy.sa import Con
-    from arcpy.sa import ExtractByMask
-    from arcpy.sa import FocalStatistics
-    from arcpy.sa import Int
-    from arcpy.sa import IsNull
-    from arcpy.sa import NbrRectangle
-    from arcpy.sa import Raster
-    from arcpy.sa import Square
-
-    # Set overwrite option
-    arcpy.env.overwriteOutput = True
-
-    # Specify core usage
-    arcpy.env.parallelProcessingFactor = "75%"
-
-    # Set snap raster and extent
-    area_raster = Raster(area_input)
-    arcpy.env.snapRaster = area_raster
-    arcpy.env.extent = area_raster.extent
-
-    # Set cell size environment
-    cell_size = arcpy.management.GetRasterProperties(area_raster, 'CELLSIZEX', '').getOutput(0)
-    arcpy.env.cellSize = int(cell_size)
-
-    # Calculate the elevation standard deviation
-    print('\tCalculating standard deviation of elevation...')
-    neighborhood = NbrRectangle(5, 5, 'CELL')
-    standard_deviation = FocalStatistics(Raster(elevation_input), neighborhood, 'STD', 'DATA')
-
-    # Calculate the square of standard deviation
-    print('\tCalculating squared standard deviation...')
-    roughness_raster = Square(standard_deviation)
-
-    # Convert null values to zero
-    print('\tConverting null values...')
-    null_raster = Con(IsNull(roughness_raster), 0, roughness_raster)
-
-    # Covert to integer
-    print('\tConverting to integer...')
-    integer_raster = Int((null_raster * conversion_factor) + 0.5)
-
-    # Extract to area raster
-    print('\tExtracting raster to area...')
-    extract_integer = ExtractByMask(integer_raster, area_raster)
-
-    # Export raster
-    print('\tExporting wetness raster as 16 bit signed...')
-    arcpy.management.CopyRaster(extract_integer,
-                                roughness_output,
-                                '',
-                                '32767',
-                                '-32768',
-                                'NONE',
-                                'NONE',
-                                '16_BIT_SIGNED',
-                                'NONE',
-                                'NONE',
-                                'TIFF',
-                                'NONE')
-    arcpy.management.BuildPyramids(roughness_output,
-                                   '-1',
-                                   'NONE',
-                                   'BILINEAR',
-                                   'LZ77',
-                                   '',
-                                   'OVERWRITE')
-    arcpy.management.CalculateStatistics(roughness_output)
+    # Calculate the variance of elevation in a 5 x 5 neighborhood of each block
+    print('\tCalculating roughness...')
+    with rasterio.open(area_input) as area_raster, \
+            rasterio.open(elevation_input) as elevation_raster, \
+            rasterio.open(roughness_output, 'w', **int16_profile(area_raster)) as roughness_raster:
+        # Define function to read elevation with a 2 cell halo
+        def read_block(tile):
+            read_window, write_window = tile
+            return (area_raster.read_masks(1, window=write_window),
+                    read_aligned(elevation_raster, area_raster, read_window))
+
+        # Calculate each block while the next block is read and the previous block is written
+        with write_behind(roughness_raster, 512, np.int16) as (output_block, submit_block):
+            for (read_window, write_window), (area_mask, elevation_block) in prefetch_blocks(
+                    read_block, tile_grid(area_raster.height, area_raster.width, size=512, overlap=2)):
+                roughness_block = output_block(write_window)
+                roughness_kernel(elevation_block, area_mask, 2, float(conversion_factor), roughness_block)
+                submit_block(roughness_block, write_window)
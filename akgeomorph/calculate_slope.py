@@ -2,11 +2,25 @@
 # ---------------------------------------------------------------------------
 # Calculate slope
 # Author: Timm Nawrocki
-# Last Updated: 2024-05-04
-# Usage: Execute in ArcGIS Pro Python 3.9+.
+# Last Updated: 2026-10-14
+# Usage: Requires numpy, numba, and rasterio.
 # Description: "Calculate slope" is a function that calculates float and integer slope in degrees.
 # ---------------------------------------------------------------------------
 
+# Import packages
+import contextlib
+import numpy as np
+import rasterio
+from akgeomorph._kernels import slope_kernel
+from akgeomorph._rast import float32_profile
+from akgeomorph._rast import int16_profile
+from akgeomorph._rast import prefetch_blocks
+from akgeomorph._rast import read_aligned
+from akgeomorph._rast import tile_grid
+from akgeomorph._rast import write_behind
+from akgeomorph._rast import z_factor
+
+
 # Define function to calculate slope
 def calculate_slope(area_input, elevation_input, z_unit, slope_float, slope_output):
     """
@@ -15,97 +29,35 @@ def calculate_slope(area_input, elevation_input, z_unit, slope_float, slope_outp
             'elevation_input' -- an input 32-bit float elevation raster
             'z-unit' -- a string of the elevation unit
             'slope_float' -- a file path for an output 32-bit float slope raster in degrees
-            'slope_output' -- a file path for an output 16-bit integer slope raster in degrees
+            'slope_output' -- [optional] a file path for an output 16-bit integer slope raster in degrees
     Returned Value: Returns a raster dataset on disk
-    Preconditions: requires float input elevation raster
+    Preconditions: requires float input elevation raster in a projected coordinate system that shares cell size and snap with the study area
     """
 
-    # Import packages
-    import arcpy
-    from arcpy.sa import ExtractByMask
-    from arcpy.sa import Int
-    from arcpy.sa import Raster
-    from arcpy.sa import SurfaceParameters
-
-    # Set overwrite option
-    arcpy.env.overwriteOutput = True
-
-    # Specify core usage
-    arcpy.env.parallelProcessingFactor = "75%"
-
-    # Set snap raster and extent
-    area_raster = Raster(area_input)
-    arcpy.env.snapRaster = area_raster
-    arcpy.env.extent = area_raster.extent
-
-    # Set cell size environment
-    cell_size = arcpy.management.GetRasterProperties(area_raster, 'CELLSIZEX', '').getOutput(0)
-    arcpy.env.cellSize = int(cell_size)
-
-    # Calculate raw slope
-    print('\tCalculating raw slope...')
-    slope_raster = SurfaceParameters(elevation_input,
-                                     'SLOPE',
-                                     'QUADRATIC',
-                                     cell_size,
-                                     'FIXED_NEIGHBORHOOD',
-                                     z_unit,
-                                     'DEGREE',
-                                     'GEODESIC_AZIMUTHS',
-                                     '')
-
-    # Convert to integer
-    print('\tConverting to integer...')
-    integer_raster = Int(slope_raster + 0.5)
-
-    # Extract to area raster
-    print('\tExtracting raster to area...')
-    extract_integer = ExtractByMask(integer_raster, area_raster)
-
-    # Export 32-bit raster
-    print('\tExporting slope as 32-bit float raster...')
-    arcpy.management.CopyRaster(slope_raster,
-                                slope_float,
-                                '',
-                                '0',
-                                '-2147483648',
-                                'NONE',
-                                'NONE',
-                                '32_BIT_FLOAT',
-                                'NONE',
-                                'NONE',
-                                'TIFF',
-                                'NONE',
-                                'CURRENT_SLICE',
-                                'NO_TRANSPOSE')
-    arcpy.management.BuildPyramids(slope_float,
-                                   '-1',
-                                   'NONE',
-                                   'BILINEAR',
-                                   'LZ77',
-                                   '',
-                                   'OVERWRITE')
-    arcpy.management.CalculateStatistics(slope_float)
-
-    # Export 16-bit raster
-    print('\tExporting slope as 16-bit integer raster...')
-    arcpy.management.CopyRaster(extract_integer,
-                                slope_output,
-                                '',
-                                '32767',
-                                '-32768',
-                                'NONE',
-                                'NONE',
-                                '16_BIT_SIGNED',
-                                'NONE',
-                                'NONE',
-                                'TIFF',
-                                'NONE')
-    arcpy.management.BuildPyramids(slope_output,
-                                   '-1',
-                                   'NONE',
-                                   'BILINEAR',
-                                   'LZ77',
-                                   '',
-                                   'OVERWRITE')
-    arcpy.management.CalculateStatistics(slope_output)
+    # Calculate slope in degrees block by block
+    print('\tCalculating and exporting slope...')
+    with rasterio.open(area_input) as area_raster, \
+            rasterio.open(elevation_input) as elevation_raster, \
+            rasterio.open(slope_float, 'w', **float32_profile(area_raster)) as float_raster, \
+            (rasterio.open(slope_output, 'w', **int16_profile(area_raster)) if slope_output != None
+             else contextlib.nullcontext()) as integer_raster:
+        # Define function to read elevation with a 1 cell halo
+        def read_block(tile):
+            read_window, write_window = tile
+            return (area_raster.read_masks(1, window=write_window),
+                    read_aligned(elevation_raster, area_raster, read_window))
+
+        # Calculate each block while the next block is read and the previous block is written
+        cell_width = abs(area_raster.transform.a)
+        cell_height = abs(area_raster.transform.e)
+        elevation_factor = z_factor(area_raster, z_unit)
+        with write_behind(float_raster, 512, np.float32) as (float_output, submit_float), \
+                write_behind(integer_raster, 512, np.int16) as (integer_output, submit_integer):
+            for (read_window, write_window), (area_mask, elevation_block) in prefetch_blocks(
+                    read_block, tile_grid(area_raster.height, area_raster.width, size=512, overlap=1)):
+                float_block = float_output(write_window)
+                integer_block = integer_output(write_window)
+                slope_kernel(elevation_block, area_mask, cell_width, cell_height, elevation_factor,
+                             float_block, integer_block)
+                submit_float(float_block, write_window)
+                submit_integer(integer_block, write_window)
@@ -2,11 +2,22 @@
 # ---------------------------------------------------------------------------
 # Calculate surface area ratio
 # Author: Timm Nawrocki
-# Last Updated: 2024-05-04
-# Usage: Must be executed in an ArcGIS Pro Python 3.7 installation.
+# Last Updated: 2026-10-14
+# Usage: Requires numpy, numba, and rasterio.
 # Description: "Calculate surface area ratio" is a function that calculates surface area ratio. This function is adapted from Geomorphometry and Gradient Metrics Toolbox 2.0 by Jeff Evans and Jim Oakleaf (2014) available at https://github.com/jeffreyevans/GradientMetrics.
 # ---------------------------------------------------------------------------
 
+# Import packages
+import numpy as np
+import rasterio
+from akgeomorph._kernels import surface_area_kernel
+from akgeomorph._rast import int16_profile
+from akgeomorph._rast import prefetch_blocks
+from akgeomorph._rast import read_aligned
+from akgeomorph._rast import tile_grid
+from akgeomorph._rast import write_behind
+
+
 # Define function to calculate surface area ratio
 def calculate_surface_area(area_input, slope_input, conversion_factor, surfacearea_output):
     """
@@ -16,71 +27,25 @@ def calculate_surface_area(area_input, slope_input, conversion_factor, surfacear
             'conversion_factor' -- an integer to be multiplied with the output for conversion to integer raster
             'surfacearea_output' -- an output 16-bit integer surface area ratio raster
     Returned Value: Returns a raster dataset on disk
-    Preconditions: requires an input float slope raster
+    Preconditions: requires an input float slope raster that shares cell size and snap with the study area
     """
 
-    # Import packages
-    from numpy import pi
-    import arcpy
-    from arcpy.sa import Cos
-    from arcpy.sa import ExtractByMask
-    from arcpy.sa import Float
-    from arcpy.sa import Int
-    from arcpy.sa import Raster
-
-    # Set overwrite option
-    arcpy.env.overwriteOutput = True
-
-    # Specify core usage
-    arcpy.env.parallelProcessingFactor = "75%"
-
-    # Set snap raster and extent
-    area_raster = Raster(area_input)
-    arcpy.env.snapRaster = area_raster
-    arcpy.env.extent = area_raster.extent
-
-    # Set cell size environment
-    cell_size = arcpy.management.GetRasterProperties(area_raster, 'CELLSIZEX', '').getOutput(0)
-    arcpy.env.cellSize = int(cell_size)
-
-    # Calculate cell area
-    cell_area = float(cell_size) ** 2
-
-    # Convert degrees to radians
-    print('\tConverting degrees to radians...')
-    slope_radian = Raster(slope_input) * (pi/180)
-
     # Calculate surface area ratio
     print('\tCalculating surface area ratio...')
-    surfacearea_raster = Float(cell_area) / Cos(slope_radian)
-
-    # Convert to integer
-    print('\tConverting to integer...')
-    integer_raster = Int((surfacearea_raster * conversion_factor) + 0.5)
-
-    # Extract to area raster
-    print('\tExtracting raster to area...')
-    extract_integer = ExtractByMask(integer_raster, area_raster)
-
-    # Export raster
-    print('\tExporting area raster as 16-bit signed...')
-    arcpy.management.CopyRaster(extract_integer,
-                                surfacearea_output,
-                                '',
-                                '32767',
-                                '-32768',
-                                'NONE',
-                                'NONE',
-                                '16_BIT_SIGNED',
-                                'NONE',
-                                'NONE',
-                                'TIFF',
-                                'NONE')
-    arcpy.management.BuildPyramids(surfacearea_output,
-                                   '-1',
-                                   'NONE',
-                                   'BILINEAR',
-                                   'LZ77',
-                                   '',
-                                   'OVERWRITE')
-    arcpy.management.CalculateStatistics(surfacearea_output)
+    with rasterio.open(area_input) as area_raster, \
+            rasterio.open(slope_input) as slope_raster, \
+            rasterio.open(surfacearea_output, 'w', **int16_profile(area_raster)) as surfacearea_raster:
+        # Define function to read aligned input blocks
+        def read_block(tile):
+            read_window, write_window = tile
+            return (area_raster.read_masks(1, window=write_window),
+                    read_aligned(slope_raster, area_raster, write_window))
+
+        # Calculate each block while the next block is read and the previous block is written
+        cell_area = abs(area_raster.transform.a * area_raster.transform.e)
+        with write_behind(surfacearea_raster, 512, np.int16) as (output_block, submit_block):
+            for (read_window, write_window), (area_mask, slope_block) in prefetch_blocks(
+                    read_block, tile_grid(area_raster.height, area_raster.width, size=512)):
+                surfacearea_block = output_block(write_window)
+                surface_area_kernel(slope_block, area_mask, cell_area, float(conversion_factor), surfacearea_block)
+                submit_block(surfacearea_block, write_window)
@@ -17,5 +17,7 @@ setuptools.setup(
     },
     license='MIT',
     packages=['akgeomorph'],
-    install_requires=['requests'],
+    python_requires='>=3.9',
+    install_requires=['numpy>=1.23', 'numba>=0.57', 'rasterio>=1.3'],
+    extras_require={'arcgis': []},
 )
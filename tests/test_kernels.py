@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Test raster kernels
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-14
+# Usage: Execute with pytest. Requires numpy, numba, and rasterio.
+# Description: "Test raster kernels" compares the compiled raster kernels with brute force numpy references on small synthetic rasters.
+# ---------------------------------------------------------------------------
+
+# Import packages
+import math
+import numpy as np
+from akgeomorph._kernels import aspect_kernel
+from akgeomorph._kernels import euclidean_distance_kernel
+from akgeomorph._kernels import position_kernel
+from akgeomorph._kernels import roughness_kernel
+from akgeomorph._kernels import slope_kernel
+from akgeomorph._kernels import wetness_kernel
+from akgeomorph._rast import update_statistics
+
+
+# Define function to convert reference values to saturated 16-bit signed integers
+def reference_int16(values, valid):
+    """
+    Description: truncates reference values offset for rounding to 16-bit signed integers, clipping to the valid data range
+    Inputs: 'values' -- a float array already offset for rounding
+            'valid' -- a boolean array where false cells are set to nodata
+    Returned Value: Returns a 16-bit signed integer array
+    Preconditions: None
+    """
+    clipped = np.clip(np.trunc(np.nan_to_num(values)), -32767, 32767)
+    return np.where(valid, clipped, -32768).astype(np.int16)
+
+
+# Define function to create a random elevation block with missing cells
+def random_elevation(rows, columns, seed):
+    """
+    Description: creates a 32-bit float elevation block with nan as nodata
+    Inputs: 'rows' -- an integer number of rows
+            'columns' -- an integer number of columns
+            'seed' -- an integer random seed
+    Returned Value: Returns the elevation block and the random generator
+    Preconditions: None
+    """
+    generator = np.random.default_rng(seed)
+    elevation = (np.cumsum(generator.normal(0, 3, (rows, columns)), axis=1) + 500).astype(np.float32)
+    elevation[generator.random((rows, columns)) < 0.05] = np.nan
+    return elevation, generator
+
+
+# Test euclidean distance against distances to every feature cell
+def test_euclidean_distance_matches_brute_force():
+    generator = np.random.default_rng(1)
+    features = generator.random((41, 37)) < 0.02
+    rows, columns = np.indices(features.shape)
+    feature_rows, feature_columns = np.nonzero(features)
+    squared = ((rows[..., None] - feature_rows) ** 2 + (columns[..., None] - feature_columns) ** 2).min(axis=-1)
+    expected = reference_int16(np.sqrt(squared) * 10.0 + 0.5, np.ones(features.shape, bool))
+    np.testing.assert_array_equal(euclidean_distance_kernel(features, 10.0), expected)
+
+
+# Test euclidean distance without feature cells
+def test_euclidean_distance_saturates_without_features():
+    features = np.zeros((5, 6), bool)
+    np.testing.assert_array_equal(euclidean_distance_kernel(features, 10.0), np.full((5, 6), 32767, np.int16))
+
+
+# Test slope and aspect on tilted planes
+def test_slope_and_aspect_match_planes():
+    rows, columns = np.indices((12, 14))
+    mask = np.ones((10, 12), np.uint8)
+    convergence = np.zeros((2, 2))
+    for east, north in [(0.3, 0.0), (0.0, -0.5), (0.2, 0.4), (-0.7, 0.1)]:
+        # Create plane that rises by east and north gradients, with rows increasing to the south
+        elevation = (east * columns * 10.0 - north * rows * 5.0).astype(np.float32)
+        # Remove a neighbor of an interior cell so that it is reflected through the center
+        elevation[4, 4] = np.nan
+        valid = ~np.isnan(elevation[1:-1, 1:-1])
+        slope = np.empty((10, 12), np.float32)
+        slope_integer = np.empty((10, 12), np.int16)
+        slope_kernel(elevation, mask, 10.0, 5.0, 1.0, slope, slope_integer)
+        expected_slope = math.degrees(math.atan(math.hypot(east, north)))
+        np.testing.assert_allclose(slope[valid], expected_slope, atol=1e-3)
+        np.testing.assert_array_equal(slope_integer[~valid], -32768)
+        aspect = np.empty((10, 12), np.float32)
+        aspect_integer = np.empty((10, 12), np.int16)
+        aspect_kernel(elevation, mask, 10.0, 5.0, convergence, aspect, aspect_integer)
+        expected_aspect = math.degrees(math.atan2(-east, -north)) % 360.0
+        np.testing.assert_allclose(aspect[valid], expected_aspect, atol=1e-3)
+
+
+# Test aspect of flat cells
+def test_aspect_marks_flat_cells():
+    elevation = np.full((5, 5), 100.0, np.float32)
+    aspect = np.empty((3, 3), np.float32)
+    aspect_integer = np.empty((3, 3), np.int16)
+    aspect_kernel(elevation, np.ones((3, 3), np.uint8), 10.0, 10.0, np.zeros((2, 2)), aspect, aspect_integer)
+    np.testing.assert_array_equal(aspect, -1.0)
+
+
+# Test topographic position against neighborhood means
+def test_position_matches_brute_force():
+    for before, after in [(2, 2), (1, 2), (3, 3)]:
+        elevation, generator = random_elevation(30 + 2 * after, 28 + 2 * after, before + after)
+        mask = (generator.random((30, 28)) > 0.1).astype(np.uint8)
+        position = np.empty((30, 28), np.int16)
+        position_kernel(elevation, mask, before, after, position)
+        expected = np.empty((30, 28))
+        for i in range(30):
+            for j in range(28):
+                neighborhood = elevation[i + after - before:i + 2 * after + 1, j + after - before:j + 2 * after + 1]
+                expected[i, j] = float(elevation[i + after, j + after]) - np.nanmean(neighborhood.astype(np.float64))
+        valid = (mask != 0) & ~np.isnan(elevation[after:-after, after:-after])
+        np.testing.assert_array_equal(position, reference_int16(expected + 0.5, valid))
+
+
+# Test roughness against neighborhood variances
+def test_roughness_matches_brute_force():
+    elevation, generator = random_elevation(34, 31, 7)
+    elevation[10:16, 10:16] = np.nan
+    mask = (generator.random((30, 27)) > 0.1).astype(np.uint8)
+    roughness = np.empty((30, 27), np.int16)
+    roughness_kernel(elevation, mask, 2, 100.0, roughness)
+    expected = np.empty((30, 27))
+    for i in range(30):
+        for j in range(27):
+            neighborhood = elevation[i:i + 5, j:j + 5].astype(np.float64)
+            expected[i, j] = np.nanvar(neighborhood) if np.isfinite(neighborhood).any() else 0.0
+    np.testing.assert_array_equal(roughness, reference_int16(expected * 100.0 + 0.5, mask != 0))
+
+
+# Test topographic wetness against the trigonometric definition
+def test_wetness_matches_reference():
+    generator = np.random.default_rng(11)
+    slope = (generator.random((44, 43)) * 40).astype(np.float32)
+    slope[generator.random((44, 43)) < 0.05] = np.nan
+    slope[5:9, 5:9] = 0.0
+    accumulation = (generator.random((40, 39)) * 1000).astype(np.float32)
+    accumulation[0:3, :] = np.nan
+    mask = (generator.random((40, 39)) > 0.1).astype(np.uint8)
+    wetness = np.empty((40, 39), np.int16)
+    wetness_kernel(slope, accumulation, mask, 2, 2, 10.0, 100.0, wetness)
+    expected = np.empty((40, 39))
+    for i in range(40):
+        for j in range(39):
+            radian = math.radians(np.nanmean(slope[i:i + 5, j:j + 5].astype(np.float64)))
+            flow = 0.0 if np.isnan(accumulation[i, j]) else float(accumulation[i, j])
+            tangent = math.tan(radian) if radian > 0 else 0.001
+            index = math.log((flow + 1) * 10.0 / tangent) * math.cos(3 * radian)
+            expected[i, j] = 0.0 if radian >= math.pi / 6 else index
+    expected = reference_int16(expected * 100.0 + 0.5, mask != 0)
+    # Allow one unit where interpolated lookup tables cross a rounding boundary
+    assert np.abs(wetness.astype(int) - expected.astype(int)).max() <= 1
+    np.testing.assert_array_equal(wetness == -32768, expected == -32768)
+
+
+# Test combined block statistics against statistics of the whole raster
+def test_update_statistics_matches_whole_raster():
+    generator = np.random.default_rng(3)
+    values = generator.normal(1000, 25, (50, 70)).astype(np.float32)
+    values[generator.random((50, 70)) < 0.1] = -9999
+    values[:, 60:] = -9999
+    totals = None
+    for row in range(0, 50, 16):
+        for column in range(0, 70, 16):
+            totals = update_statistics(totals, values[row:row + 16, column:column + 16], -9999)
+    valid = values[values != -9999].astype(np.float64)
+    count, mean, deviation, minimum, maximum = totals
+    assert count == valid.size
+    assert math.isclose(mean, valid.mean(), rel_tol=1e-12)
+    assert math.isclose(deviation, ((valid - valid.mean()) ** 2).sum(), rel_tol=1e-9)
+    assert minimum == valid.min() and maximum == valid.max()